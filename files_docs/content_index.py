@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Content Hash Index
+Finds duplicate files across Downloads, _ORGANIZED and iCloud Documents,
+hashing as little as possible and remembering hashes between runs
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+import argparse
+import platform
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# icloud_placeholders.py is saved next to this script, or found in the repo's scripts folder
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts_instructions"))
+from icloud_placeholders import is_icloud_placeholder, is_dataless
+
+INDEX_NAME = "content_hash_index.json"
+INDEX_VERSION = 2
+# Bytes read from each end of a file for the partial hash
+PARTIAL_BLOCK = 64 * 1024
+HASH_CHUNK = 1024 * 1024
+# Hashing waits on the disk (or iCloud), and hashlib releases the GIL
+DEFAULT_HASH_WORKERS = 8
+# Entries for files not seen for this long are dropped from the index
+INDEX_MAX_AGE_DAYS = 30
+
+
+def get_default_roots():
+    """Downloads (with its _ORGANIZED folder) and iCloud Documents"""
+    home = Path.home()
+    return [home / "Downloads", home / "Library/Mobile Documents/com~apple~CloudDocs/Documents"]
+
+
+def get_index_path():
+    """The index lives in the knowledge map's local (never synced) cache directory"""
+    system = platform.system()
+    home = Path.home()
+
+    if system == "Darwin":  # macOS
+        cache_dir = home / "Library" / "Caches" / "knowledge_map"
+    elif system == "Windows":
+        cache_dir = Path(os.environ.get("LOCALAPPDATA", home / "AppData" / "Local")) / "knowledge_map"
+    else:  # Linux
+        cache_dir = Path(os.environ.get("XDG_CACHE_HOME", home / ".cache")) / "knowledge_map"
+    return cache_dir / INDEX_NAME
+
+
+def iter_files(roots):
+    """(path, stat) for every regular file below roots, once per inode
+
+    Symlinks are not followed and iCloud placeholders are skipped, so
+    nothing is downloaded. Extra hard links to a file are left out: they
+    are the same file, not a duplicate.
+    """
+    seen = set()
+    stack = [str(root) for root in roots if os.path.isdir(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_icloud_placeholder(entry.name) or is_dataless(st) or (st.st_dev, st.st_ino) in seen:
+                        continue
+                    seen.add((st.st_dev, st.st_ino))
+                    yield entry.path, st
+        except OSError:
+            continue
+
+
+class ContentHashIndex:
+    """File hashes cached by (device, inode, size, mtime)
+
+    A file keeps its cache entry while its device, inode, size and mtime are
+    unchanged, including after it is moved or renamed, so a repeat run only
+    hashes new or changed files. Each entry holds a partial hash of the
+    first and last PARTIAL_BLOCK bytes and, once needed, the full SHA-256.
+    """
+
+    def __init__(self, path=None, workers=DEFAULT_HASH_WORKERS):
+        self.path = Path(path) if path else get_index_path()
+        self.workers = max(1, workers)
+        self.entries = {}
+        self.loaded = set()  # keys that came from disk, for the reuse count
+        self.reused = set()  # keys whose partial or full hash came from disk
+        self.stats = {"files": 0, "size_candidates": 0, "partial_candidates": 0,
+                      "partial_hashed": 0, "full_hashed": 0, "reused": 0, "bytes_read": 0}
+        self.now = int(time.time())
+        self._lock = threading.Lock()  # stats are updated from hashing threads
+
+    @staticmethod
+    def key(st):
+        # Inode numbers are only unique on one device
+        return f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") == INDEX_VERSION:
+            self.entries = data.get("entries", {})
+            self.loaded = set(self.entries)
+        return self
+
+    def save(self):
+        """Write the index atomically, without entries unseen for INDEX_MAX_AGE_DAYS"""
+        cutoff = self.now - INDEX_MAX_AGE_DAYS * 86400
+        entries = {key: entry for key, entry in self.entries.items() if entry.get("seen", 0) >= cutoff}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"version": INDEX_VERSION, "entries": entries}, separators=(',', ':')))
+        os.replace(temp, self.path)
+
+    def _entry(self, st):
+        entry = self.entries.setdefault(self.key(st), {})
+        entry["seen"] = self.now
+        return entry
+
+    def _read_partial(self, path, size):
+        """Partial hash; for a file no bigger than two blocks it is also the full hash"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            if size <= 2 * PARTIAL_BLOCK:
+                data = f.read()
+                digest.update(data)
+                return digest.hexdigest(), digest.hexdigest(), len(data)
+            digest.update(f.read(PARTIAL_BLOCK))
+            f.seek(size - PARTIAL_BLOCK)
+            digest.update(f.read(PARTIAL_BLOCK))
+        return digest.hexdigest(), None, 2 * PARTIAL_BLOCK
+
+    def _read_full(self, path):
+        digest = hashlib.sha256()
+        read = 0
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(HASH_CHUNK)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                read += len(chunk)
+        return digest.hexdigest(), read
+
+    def _count(self, counter, read=0):
+        with self._lock:
+            self.stats[counter] += 1
+            self.stats["bytes_read"] += read
+
+    def _count_reused(self, key):
+        """Count a file reused from the index once, whether one or both hashes were"""
+        with self._lock:
+            if key not in self.reused:
+                self.reused.add(key)
+                self.stats["reused"] += 1
+
+    def partial_hash(self, path, st):
+        entry = self._entry(st)
+        if "partial" not in entry:
+            entry["partial"], full, read = self._read_partial(path, st.st_size)
+            if full:
+                entry["sha256"] = full
+            self._count("partial_hashed", read)
+        elif self.key(st) in self.loaded:
+            self._count_reused(self.key(st))
+        return entry["partial"]
+
+    def full_hash(self, path, st):
+        entry = self._entry(st)
+        if "sha256" not in entry:
+            entry["sha256"], read = self._read_full(path)
+            self._count("full_hashed", read)
+        elif self.key(st) in self.loaded:
+            self._count_reused(self.key(st))
+        return entry["sha256"]
+
+    def cached_hash(self, st):
+        """The full SHA-256 already known for a file, or None"""
+        entry = self.entries.get(self.key(st))
+        return entry.get("sha256") if entry else None
+
+    def _hash_all(self, files, hash_file):
+        """{path: hash} for (path, stat) pairs, skipping files that vanished"""
+        def one(item):
+            path, st = item
+            try:
+                return path, hash_file(path, st)
+            except OSError:
+                return path, None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return {path: digest for path, digest in pool.map(one, files) if digest is not None}
+
+    def find_duplicates(self, files):
+        """Groups of identical files, as (size, sha256, [paths]), biggest waste first
+
+        Files are bucketed by size; only sizes shared by several files get a
+        partial hash, and only partial hashes shared by several files get a
+        full SHA-256. Empty files are not reported.
+        """
+        by_size = {}
+        for path, st in files:
+            self.stats["files"] += 1
+            if st.st_size:
+                by_size.setdefault(st.st_size, []).append((path, st))
+        candidates = [item for group in by_size.values() if len(group) > 1 for item in group]
+        self.stats["size_candidates"] = len(candidates)
+
+        partials = self._hash_all(candidates, self.partial_hash)
+        by_partial = {}
+        for path, st in candidates:
+            if path in partials:
+                by_partial.setdefault((st.st_size, partials[path]), []).append((path, st))
+        colliding = [item for group in by_partial.values() if len(group) > 1 for item in group]
+        self.stats["partial_candidates"] = len(colliding)
+
+        fulls = self._hash_all(colliding, self.full_hash)
+        by_hash = {}
+        for path, st in colliding:
+            if path in fulls:
+                by_hash.setdefault((st.st_size, fulls[path]), []).append(path)
+
+        groups = [(size, digest, sorted(paths)) for (size, digest), paths in by_hash.items() if len(paths) > 1]
+        groups.sort(key=lambda group: (-(group[0] * (len(group[2]) - 1)), group[2][0]))
+        return groups
+
+
+def report_duplicates(groups, stats, elapsed, limit=20):
+    wasted = sum(size * (len(paths) - 1) for size, _, paths in groups)
+    print(f"🔍 Checked {stats['files']:,} files in {elapsed:.1f}s: "
+          f"{stats['size_candidates']:,} share a size, "
+          f"{stats['partial_candidates']:,} share a partial hash")
+    print(f"🧮 Hashed {stats['partial_hashed']:,} partial and {stats['full_hashed']:,} full, "
+          f"{stats['reused']:,} reused from the index, {stats['bytes_read'] / 1e6:,.1f} MB read")
+    print(f"🧬 {len(groups):,} groups of duplicates, {wasted / 1e6:,.1f} MB in extra copies")
+    for size, digest, paths in groups[:limit]:
+        print(f"\n   {len(paths)} × {size / 1e6:,.2f} MB  sha256 {digest[:12]}")
+        for path in paths:
+            print(f"   • {path}")
+    if len(groups) > limit:
+        print(f"\n   … and {len(groups) - limit} more groups (--limit to show more)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find duplicate files with a persistent content-hash index")
+    parser.add_argument("roots", nargs="*", type=Path,
+                        help="folders to check (default: Downloads and iCloud Documents)")
+    parser.add_argument("--index", type=Path, default=get_index_path(),
+                        help="hash index file (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_HASH_WORKERS,
+                        help="files hashed in parallel (default: %(default)s)")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="duplicate groups to list (default: %(default)s)")
+    args = parser.parse_args()
+
+    roots = args.roots or get_default_roots()
+    index = ContentHashIndex(args.index, args.workers).load()
+    start = time.perf_counter()
+    groups = index.find_duplicates(iter_files(roots))
+    elapsed = time.perf_counter() - start
+    index.save()
+    report_duplicates(groups, index.stats, elapsed, args.limit)
+    sys.exit(0)
@@ -32,6 +32,8 @@ class ProjectWorkspacesDeployer:
         # Build paths using the detected Documents location
         self.knowledge_map_dir = base_docs / "_AUTOMATION" / "knowledge_map"
         self.project_workspaces_dir = self.knowledge_map_dir / "Project_Workspaces"
+        # Shared categorization engine, installed next to workspace_automation.py
+        self.category_rules_source = Path(__file__).resolve().parent.parent / "scripts_instructions" / "category_rules.py"
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.operations_log = []
         self.deployment_report = []
@@ -526,10 +528,14 @@ Provides automated file sorting and maintenance for workspace directories
 """
 
 import os
+import sys
 import shutil
 from pathlib import Path
 from datetime import datetime, timedelta
 
+sys.path.insert(0, str(Path(__file__).parent))
+from category_rules import CategoryRules
+
 class WorkspaceAutomation:
     def __init__(self):
         self.workspace_root = Path(__file__).parent
@@ -547,20 +553,20 @@ class WorkspaceAutomation:
             "Knowledge_Management": ["practice", "lesson", "reference", "process"],
             "Active_Development": ["prototype", "sample", "test", "current"]
         }
+        rules = CategoryRules(keyword_rules=categorization_rules)
         
         for file in source_path.iterdir():
             if file.is_file():
-                file_lower = file.name.lower()
-                for category, keywords in categorization_rules.items():
-                    if any(keyword in file_lower for keyword in keywords):
-                        destination = self.workspace_root / "ClaudeOfficeSpace" / category
-                        if destination.exists():
-                            try:
-                                shutil.move(str(file), str(destination / file.name))
-                                self.operations_log.append(f"Moved {file.name} to {category}")
-                                break
-                            except Exception as e:
-                                self.operations_log.append(f"Error moving {file.name}: {e}")
+                # Matching categories in rule order; the next one is tried if a move fails
+                for category in rules.matches(file.name):
+                    destination = self.workspace_root / "ClaudeOfficeSpace" / category
+                    if destination.exists():
+                        try:
+                            shutil.move(str(file), str(destination / file.name))
+                            self.operations_log.append(f"Moved {file.name} to {category}")
+                            break
+                        except Exception as e:
+                            self.operations_log.append(f"Error moving {file.name}: {e}")
     
     def cleanup_old_files(self, days_old=90):
         """Archive files older than specified days"""
@@ -590,7 +596,7 @@ class WorkspaceAutomation:
             if workspace.is_dir() and not workspace.name.startswith('.'):
                 workspace_files = sum(1 for _ in workspace.rglob('*') if _.is_file())
                 total_files += workspace_files
-                report.append(f"\n{workspace.name}: {workspace_files} files")
+                report.append(f"\\n{workspace.name}: {workspace_files} files")
                 
                 # Category breakdown for ClaudeOfficeSpace
                 if workspace.name == "ClaudeOfficeSpace":
@@ -599,8 +605,8 @@ class WorkspaceAutomation:
                             category_files = sum(1 for _ in category.rglob('*') if _.is_file())
                             report.append(f"  - {category.name}: {category_files} files")
         
-        report.append(f"\nTotal files across all workspaces: {total_files}")
-        report.append(f"\nOperations performed: {len(self.operations_log)}")
+        report.append(f"\\nTotal files across all workspaces: {total_files}")
+        report.append(f"\\nOperations performed: {len(self.operations_log)}")
         
         return "\\n".join(report)
 
@@ -614,6 +620,12 @@ if __name__ == "__main__":
         automation_script_path.write_text(automation_script)
         os.chmod(automation_script_path, 0o755)
         self.deployment_report.append("Created workspace_automation.py")
+
+        if self.category_rules_source.exists():
+            shutil.copy2(self.category_rules_source, self.project_workspaces_dir / "category_rules.py")
+            self.deployment_report.append("Installed category_rules.py for workspace_automation.py")
+        else:
+            print(f"⚠️ {self.category_rules_source} not found; copy category_rules.py next to workspace_automation.py")
         print("✅ Automation integration scripts created")
 
     def test_deployment(self):
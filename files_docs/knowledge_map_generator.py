@@ -4,144 +4,1292 @@ Dynamic Knowledge Map Generator
 Scans file system and generates JSON data for visualization
 """
 
+import io
+import os
+import re
+import sys
+import gzip
 import json
+import stat
+import errno
+import ctypes
+import ctypes.util
+import select
+import shutil
+import struct
+import hashlib
+import platform
+import time
+import argparse
+import tempfile
+import unicodedata
+import importlib.util
+from bisect import bisect_right
+from contextlib import contextmanager, ExitStack
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-def scan_file_system():
-    """Scan and generate current file system data"""
-    
-    nodes = []
-    links = []
-    node_map = {}
-    node_id = 0
-    
-    # Define locations to scan
-    locations = [
+# icloud_placeholders.py is saved next to this script, or found in the repo's scripts folder
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts_instructions"))
+from icloud_placeholders import is_icloud_placeholder, read_icloud_placeholder
+
+try:
+    from content_index import ContentHashIndex, INDEX_NAME as CONTENT_INDEX_NAME
+except ImportError:  # content_index.py is not installed next to this script
+    ContentHashIndex = None
+
+# Folders that get one extra level of nodes in the graph
+IMPORTANT_FOLDERS = ["_AUTOMATION", "_ORGANIZED", "Projects_By_Topic"]
+
+
+def get_scan_locations():
+    """Locations to scan as (id, path, category) tuples"""
+    return [
         ("docs", Path.home() / "Library/Mobile Documents/com~apple~CloudDocs/Documents", "location"),
         ("downloads", Path.home() / "Downloads", "location")
-    ]
-    
-    # Scan each location
-    for loc_id, loc_path, loc_type in locations:
-        if not loc_path.exists():
+    ] + get_config_locations()
+
+
+def get_config_locations():
+    """Extra locations from KnowledgeMapConfig.base_paths
+
+    Read from the config.py that deploy_project_workspaces.py installs next to
+    this script. Most of these folders sit inside docs or downloads; see
+    plan_scan_roots() for how that is handled.
+    """
+    config_path = Path(__file__).with_name("config.py")
+    if not config_path.exists():
+        return []
+    try:
+        spec = importlib.util.spec_from_file_location("knowledge_map_config", config_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        base_paths = module.KnowledgeMapConfig().base_paths
+    except Exception as e:
+        print(f"⚠️  Could not load base paths from {config_path}: {e}")
+        return []
+    return [(f"base_{name.lower()}", Path(path), "location") for name, path in base_paths.items()]
+
+
+# Topic keywords that link nodes with related names
+SEMANTIC_KEYWORDS = ['ai', 'research', 'career', 'oxford', 'technical', 'project']
+# 0 links every matching pair, as before; --max-semantic-links caps big maps
+DEFAULT_MAX_SEMANTIC_LINKS = 0
+
+# Worker pool sizes for concurrent scanning; scans wait on the filesystem,
+# not the CPU, so these can exceed the core count
+DEFAULT_SCAN_WORKERS = 8
+DEFAULT_CLOUD_WORKERS = 4
+
+CLOUD_PATH_MARKERS = ("/Mobile Documents/", "/Library/CloudStorage/")
+NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "afpfs", "webdav",
+                    "davfs", "fuse.sshfs", "fuse.rclone"}
+
+# Gitignore-style rules for folders and files the scanner never visits.
+# Rules apply to every location, plus LOCATION_EXCLUDES for that location id,
+# plus a .knowledgemapignore file in the location root if there is one.
+DEFAULT_EXCLUDES = [
+    ".git/",
+    "node_modules/",
+    "__pycache__/",
+    ".venv/",
+    "venv/",
+    ".tox/",
+    ".mypy_cache/",
+    ".pytest_cache/",
+    ".Trash/",
+    "*.app/",
+]
+LOCATION_EXCLUDES = {
+    "docs": [],
+    "downloads": [],
+}
+IGNORE_FILE_NAME = ".knowledgemapignore"
+
+# "never" counts a symlink as a plain entry, "files" counts the file it points
+# to, "all" also descends into symlinked folders (skipping ones that loop back)
+SYMLINK_POLICIES = ("never", "files", "all")
+DEFAULT_SYMLINK_POLICY = "files"
+
+MANIFEST_NAME = "knowledge_map_manifest.json"
+PUBLISH_STATE_NAME = "publish_state.json"
+NODE_IDS_NAME = "knowledge_map_node_ids.json"
+NODE_IDS_VERSION = 1
+
+# Watch mode: a burst of events ends after WATCH_DEBOUNCE quiet seconds,
+# and a long burst is still published every WATCH_MAX_BATCH_WAIT seconds
+WATCH_DEBOUNCE = 0.5
+WATCH_MAX_BATCH_WAIT = 2.0
+# Polling backs off while the tree is quiet, but never past the two-second
+# publish promise of watch mode
+POLL_MIN_INTERVAL = 1.0
+POLL_MAX_INTERVAL = 2.0
+
+# inotify event bits (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+
+# Output fields that change on every run without the graph changing
+VOLATILE_FIELDS = {"generated"}
+
+# The generator's own files are not counted, or every publish would change the graph
+GENERATED_FILE_NAMES = {"knowledge_map_data.json", "knowledge_map_data.json.gz", MANIFEST_NAME}
+MANIFEST_VERSION = 8
+
+# Directory fingerprints are a Merkle hash of each folder's files (name, size,
+# content) and subfolders (name, fingerprint). Content is the SHA-256 cached by
+# content_index.py, keyed "dev:inode:size:mtime_ns", or the mtime when none is cached
+FILE_HASHES = {}
+FINGERPRINT_LENGTH = 32
+EMPTY_FINGERPRINT = hashlib.sha256(b"").hexdigest()[:FINGERPRINT_LENGTH]
+
+# Counters kept per directory in the manifest, so reused directories still report them
+DIR_COUNTERS = ("pruned_dirs", "excluded_files", "placeholders", "symlink_cycles")
+
+
+def new_scan_counters():
+    return {"dirs": 0, "stat_calls": 0, "listed_dirs": 0, "reused_dirs": 0, "moved_dirs": 0,
+            "relinked_dirs": 0, "pruned_dirs": 0, "excluded_files": 0, "placeholders": 0, "symlink_cycles": 0,
+            "duplicate_links": 0, "nested_roots": 0}
+
+
+class DirStats:
+    """Aggregated file counts and sizes for one directory subtree"""
+
+    __slots__ = ("path", "name", "parent", "children", "mtime", "ident", "linked", "links",
+                 "inodes", "entries", "total_entries", "files", "hidden_files", "bytes",
+                 "files_fingerprint", "fingerprint")
+
+    def __init__(self, path, parent=None, mtime=None, ident=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.parent = parent
+        self.children = {}
+        self.mtime = mtime       # directory st_mtime_ns, None if unknown
+        self.ident = ident       # directory (st_dev, st_ino), None if unknown
+        self.linked = parent is not None and parent.linked  # reached through a folder symlink
+        self.links = []          # (dev, ino, size, hidden, target, placeholder) for count_linked_files()
+        self.inodes = []         # st_ino of the files counted directly in `files`
+        self.entries = 0         # direct entries of this directory
+        self.total_entries = 0   # every entry anywhere below this directory
+        self.files = 0           # files below this directory, excluding dot-named files
+        self.hidden_files = 0    # dot-named files such as .DS_Store
+        self.bytes = 0           # size of the files counted in `files`
+        self.files_fingerprint = EMPTY_FINGERPRINT  # hash of the direct files only
+        self.fingerprint = None  # Merkle hash of the whole subtree, see _fingerprint()
+
+    def sorted_children(self):
+        return [self.children[name] for name in sorted(self.children)]
+
+    def on_path(self, ident):
+        """True if this directory or one of its ancestors is the directory ident"""
+        node = self
+        while node is not None:
+            if node.ident == ident:
+                return True
+            node = node.parent
+        return False
+
+
+def load_file_hashes(cache_dir):
+    """Full SHA-256s that content_index.py has cached, for directory fingerprints"""
+    if ContentHashIndex is None:
+        return {}
+    index = ContentHashIndex(Path(cache_dir) / CONTENT_INDEX_NAME).load()
+    return {key: entry["sha256"] for key, entry in index.entries.items() if "sha256" in entry}
+
+
+def _fingerprint_entry(name, size, st=None):
+    """One file's line in its folder's fingerprint; st is None for iCloud placeholders"""
+    if st is None:
+        content = "icloud"
+    elif not size:
+        content = ""
+    else:
+        content = FILE_HASHES.get(f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}") or f"m{st.st_mtime_ns}"
+    return f"{name}\0{size}\0{content}"
+
+
+def _digest(lines):
+    return hashlib.sha256("\n".join(sorted(lines)).encode("utf-8", "surrogateescape")).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def _fingerprint(node):
+    """Set node.fingerprint from its files and its subfolders' fingerprints"""
+    lines = [f"/{name}\0{child.fingerprint}" for name, child in node.children.items()]
+    lines.append(f"\0{node.files_fingerprint}")
+    node.fingerprint = _digest(lines)
+
+
+def _root_stats(path):
+    """DirStats for a walk root, with its mtime and identity if it can be stat-ed"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return DirStats(path)
+    return DirStats(path, mtime=st.st_mtime_ns, ident=(st.st_dev, st.st_ino))
+
+
+def _list_directory(current, stack, counters, matcher=None, symlinks=DEFAULT_SYMLINK_POLICY):
+    """List one directory, filling its direct counts and queueing subdirectories
+
+    Entries matched by the exclusion rules are skipped; excluded directories
+    are never opened. iCloud placeholders count as the file they stand for.
+    Files that may be reached under another name (hard links, symlinks and
+    anything below a followed folder symlink) go into current.links instead
+    of the counts; count_linked_files() counts each of them once.
+    """
+    # BUG FIX #5: Add error handling for permission denied and other scanning errors
+    # An unreadable directory is counted as empty instead of aborting the scan
+    fingerprint_lines = []
+    try:
+        with os.scandir(current.path) as it:
+            for entry in it:
+                if entry.name in GENERATED_FILE_NAMES:
+                    continue
+                try:
+                    is_link = entry.is_symlink()
+                    is_dir = entry.is_dir(follow_symlinks=symlinks == "all")
+                    if matcher is not None and matcher.excluded(entry.path, entry.name, is_dir):
+                        counters["pruned_dirs" if is_dir else "excluded_files"] += 1
+                        continue
+                    current.entries += 1
+                    if is_dir:
+                        counters["stat_calls"] += 1
+                        st = entry.stat(follow_symlinks=is_link)
+                        ident = (st.st_dev, st.st_ino)
+                        if is_link and current.on_path(ident):
+                            # BUG FIX: a folder symlink back to an ancestor would loop forever
+                            counters["symlink_cycles"] += 1
+                            continue
+                        child = DirStats(entry.path, current, st.st_mtime_ns, ident)
+                        child.linked = child.linked or is_link
+                        current.children[entry.name] = child
+                        stack.append(child)
+                    elif is_link and symlinks == "never":
+                        continue
+                    elif entry.is_file():
+                        if is_icloud_placeholder(entry.name):
+                            # Count the evicted file under its real name and size
+                            name, size = read_icloud_placeholder(entry.path)
+                            hidden = name.startswith('.')
+                            if not hidden:
+                                fingerprint_lines.append(_fingerprint_entry(name, size))
+                            if is_link or current.linked:
+                                # BUG FIX: a stub reached through a folder symlink is
+                                # deduplicated by its (dev, ino) like any other file
+                                counters["stat_calls"] += 1
+                                st = entry.stat()
+                                target = os.path.realpath(entry.path) if st.st_nlink == 1 else None
+                                current.links.append((st.st_dev, st.st_ino,
+                                                      0 if hidden else size, hidden, target, True))
+                                continue
+                            counters["placeholders"] += 1
+                            if hidden:
+                                current.hidden_files += 1
+                            else:
+                                current.files += 1
+                                current.bytes += size
+                        elif entry.name.startswith('.') and not (is_link or current.linked):
+                            current.hidden_files += 1
+                        else:
+                            counters["stat_calls"] += 1
+                            st = entry.stat()
+                            hidden = entry.name.startswith('.')
+                            if not hidden:
+                                fingerprint_lines.append(_fingerprint_entry(entry.name, st.st_size, st))
+                            if is_link or current.linked or st.st_nlink > 1:
+                                # A single-link file reached by symlink also sits at its
+                                # real path, which may be counted on its own
+                                target = None
+                                if st.st_nlink == 1:
+                                    target = os.path.realpath(entry.path)
+                                current.links.append((st.st_dev, st.st_ino,
+                                                      0 if hidden else st.st_size, hidden, target,
+                                                      False))
+                            else:
+                                current.files += 1
+                                current.bytes += st.st_size
+                                current.inodes.append(st.st_ino)
+                except OSError:
+                    # Entry vanished or is unreadable mid-scan
+                    continue
+    except PermissionError:
+        print(f"⚠️  Permission denied accessing {current.path}")
+        return False
+    except OSError as e:
+        print(f"⚠️  Error scanning {current.path}: {e}")
+        return False
+    counters["listed_dirs"] += 1
+    current.files_fingerprint = _digest(fingerprint_lines)
+    current.inodes.sort()
+    return True
+
+
+def _reuse_directory(current, cached, stack, counters):
+    """Fill direct counts from a manifest record and queue the cached subdirectories
+
+    Subdirectories still get one stat each, because a change deep in the tree
+    does not touch the mtime of its ancestors.
+    """
+    current.entries = cached["entries"]
+    current.files = cached["files"]
+    current.hidden_files = cached["hidden_files"]
+    current.bytes = cached["bytes"]
+    current.links = [tuple(link) for link in cached["links"]]
+    current.inodes = cached["inodes"]
+    current.files_fingerprint = cached["files_fingerprint"]
+    for key in DIR_COUNTERS:
+        counters[key] += cached[key]
+    for name in cached["dirs"]:
+        path = os.path.join(current.path, name)
+        try:
+            counters["stat_calls"] += 1
+            st = os.stat(path, follow_symlinks=False)
+            is_link = stat.S_ISLNK(st.st_mode)
+            if is_link:
+                # Only recorded under the "all" policy, which the manifest rules pin
+                counters["stat_calls"] += 1
+                st = os.stat(path)
+        except OSError:
+            continue
+        child = DirStats(path, current, st.st_mtime_ns, (st.st_dev, st.st_ino))
+        child.linked = child.linked or is_link
+        current.children[name] = child
+        stack.append(child)
+    counters["reused_dirs"] += 1
+
+
+def _visit_directory(current, stack, counters, manifest, new_manifest, matcher=None,
+                     symlinks=DEFAULT_SYMLINK_POLICY):
+    """List or reuse one directory and record it in new_manifest
+
+    A directory is reused when its record is unchanged at the same path, or
+    when it was moved: its (st_dev, st_ino) and mtime match the record of a
+    path where it no longer is (renaming a folder does not touch its mtime).
+    """
+    counters["dirs"] += 1
+    before = [counters[key] for key in DIR_COUNTERS]
+
+    cached = manifest.get(current.path)
+    moved = cached is None and isinstance(manifest, DirManifest) and not current.linked
+    if moved:
+        cached = manifest.moved_record(current.path, current.ident)
+    if cached is not None and current.mtime is not None and cached["mtime"] == current.mtime:
+        _reuse_directory(current, cached, stack, counters)
+        if moved:
+            counters["moved_dirs"] += 1
+        listed = True
+    else:
+        listed = _list_directory(current, stack, counters, matcher, symlinks)
+
+    if new_manifest is not None and listed and current.mtime is not None:
+        record = {
+            "mtime": current.mtime,
+            "entries": current.entries,
+            "files": current.files,
+            "hidden_files": current.hidden_files,
+            "bytes": current.bytes,
+            "dirs": sorted(current.children),
+            "links": current.links,
+            "inodes": current.inodes,
+            "files_fingerprint": current.files_fingerprint,
+        }
+        if current.ident is not None and not current.linked:
+            record["ident"] = list(current.ident)
+        for key, start in zip(DIR_COUNTERS, before):
+            record[key] = counters[key] - start
+        new_manifest[current.path] = record
+
+
+def _roll_up(node):
+    """Add a finished subtree's totals into its parent"""
+    parent = node.parent
+    parent.total_entries += node.total_entries
+    parent.files += node.files
+    parent.hidden_files += node.hidden_files
+    parent.bytes += node.bytes
+
+
+def _record_totals(nodes, new_manifest):
+    if new_manifest is None:
+        return
+    for node in nodes:
+        record = new_manifest.get(node.path)
+        if record is not None:
+            record["total_files"] = node.files
+            record["total_bytes"] = node.bytes
+            record["fingerprint"] = node.fingerprint
+
+
+def _walk_subtree(top, counters, manifest, new_manifest, matcher=None,
+                  symlinks=DEFAULT_SYMLINK_POLICY):
+    """Aggregate everything below top; top itself is not rolled into its parent
+
+    Held-back linked files are not counted yet, see count_linked_files().
+    """
+    order = []
+    stack = [top]
+
+    while stack:
+        current = stack.pop()
+        order.append(current)
+        _visit_directory(current, stack, counters, manifest, new_manifest, matcher, symlinks)
+
+    # Parents are always listed before their children, so walking the order
+    # backwards rolls each subtree up before its parent is read
+    for node in reversed(order):
+        node.total_entries += node.entries
+        _fingerprint(node)
+        if node is not top:
+            _roll_up(node)
+
+    _record_totals(order, new_manifest)
+    return order
+
+
+def count_linked_files(tree, owners, counters=None, new_manifest=None, roots=None):
+    """Count each held-back linked file once, at the first folder that holds it
+
+    Folders are visited in sorted path order, so the folder a file is counted
+    in does not depend on the order of the walk. owners maps (st_dev, st_ino)
+    to the path of that folder and is shared across trees, so a file linked
+    from two locations is counted in the first one. A symlink to a plain file
+    inside one of roots (real paths of the walked locations, tree's own by
+    default) is skipped, since the walk counts that file where it is.
+    Counts are added to the folder and its ancestors up to tree.
+    """
+    if roots is None:
+        roots = [os.path.realpath(tree.path)]
+    touched = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        stack.extend(reversed(node.sorted_children()))
+        for dev, ino, size, hidden, target, placeholder in node.links:
+            key = (dev, ino)
+            if key in owners or (target is not None
+                                 and any(_is_within(target, root) for root in roots)):
+                if counters is not None:
+                    counters["duplicate_links"] += 1
+                continue
+            owners[key] = node.path
+            if placeholder and counters is not None:
+                counters["placeholders"] += 1
+            ancestor = node
+            while True:
+                if hidden:
+                    ancestor.hidden_files += 1
+                else:
+                    ancestor.files += 1
+                    ancestor.bytes += size
+                touched.add(ancestor)
+                if ancestor is tree:
+                    break
+                ancestor = ancestor.parent
+    _record_totals(touched, new_manifest)
+
+
+def _directory_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def aggregate_directory(root, counters=None, manifest=None, new_manifest=None, matcher=None,
+                        symlinks=DEFAULT_SYMLINK_POLICY, link_owners=None, link_roots=None):
+    """Walk root once with os.scandir and roll file counts and sizes up the tree
+
+    Every directory is listed at most once. symlinks is one of SYMLINK_POLICIES;
+    folder symlinks are only followed under "all". A file with several hard
+    links or symlinks is counted and sized once, see count_linked_files(),
+    whose owners map link_owners and roots link_roots are. When a manifest from a previous run is
+    given, directories whose mtime is unchanged are not listed again and their
+    cached counts are reused (a file that gains its first extra hard link keeps
+    its plain count in such a folder, since links do not touch folder mtimes;
+    scan_locations() finds and re-lists those folders). Records for every scanned directory are
+    written into new_manifest. matcher (an ExcludeMatcher) prunes excluded folders
+    before they are opened. Returns the DirStats for root.
+    """
+    if counters is None:
+        counters = new_scan_counters()
+    if manifest is None:
+        manifest = {}
+    if link_owners is None:
+        link_owners = {}
+
+    top = _root_stats(str(root))
+    _walk_subtree(top, counters, manifest, new_manifest, matcher, symlinks)
+    count_linked_files(top, link_owners, counters, new_manifest, link_roots)
+    return top
+
+
+def is_cloud_path(path):
+    """True for iCloud/File Provider folders and network mounts
+
+    These are dominated by fetch latency, so they get their own smaller
+    worker pool instead of competing with local disks.
+    """
+    path = str(path)
+    if any(marker in path for marker in CLOUD_PATH_MARKERS):
+        return True
+    return _mount_fs_type(path) in NETWORK_FS_TYPES
+
+
+def _mount_fs_type(path):
+    """Filesystem type of the mount containing path (Linux only)"""
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None
+
+    best, fs_type = "", None
+    for mount_point, mount_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) \
+                and len(mount_point) > len(best):
+            best, fs_type = mount_point, mount_type
+    return fs_type
+
+
+def _scan_subtree_task(child, manifest, track_manifest, matcher, symlinks):
+    """Worker: aggregate one first-level subtree with private counters"""
+    counters = new_scan_counters()
+    new_manifest = {} if track_manifest else None
+    _walk_subtree(child, counters, manifest, new_manifest, matcher, symlinks)
+    return counters, new_manifest
+
+
+def scan_locations_parallel(locations, counters, manifest, new_manifest,
+                            workers=DEFAULT_SCAN_WORKERS, cloud_workers=DEFAULT_CLOUD_WORKERS,
+                            matchers=None, symlinks=DEFAULT_SYMLINK_POLICY, link_owners=None,
+                            link_roots=None):
+    """Aggregate locations with their first-level subtrees spread over a thread pool
+
+    Location roots are listed on the calling thread; every first-level
+    subdirectory becomes one task. Tasks on cloud or network mounts share a
+    pool capped at cloud_workers. Results are merged in sorted name order, and
+    linked files are counted after the merge, so the output does not depend on
+    which worker finishes first.
+    """
+    if counters is None:
+        counters = new_scan_counters()
+    if manifest is None:
+        manifest = {}
+    if link_owners is None:
+        link_owners = {}
+    if matchers is None:
+        matchers = get_exclude_matchers(locations)
+
+    local_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+    cloud_pool = ThreadPoolExecutor(max_workers=max(1, min(workers, cloud_workers)),
+                                    thread_name_prefix="scan-cloud")
+    pending = []
+
+    with local_pool, cloud_pool:
+        for loc_id, loc_path, loc_type in locations:
+            if not loc_path.exists():
+                continue
+            pool = cloud_pool if is_cloud_path(loc_path) else local_pool
+            matcher = matchers.get(loc_id)
+
+            top = _root_stats(str(loc_path))
+            children = []
+            _visit_directory(top, children, counters, manifest, new_manifest, matcher, symlinks)
+            children.sort(key=lambda child: child.name)
+            futures = [(child, pool.submit(_scan_subtree_task, child, manifest,
+                                           new_manifest is not None, matcher, symlinks))
+                       for child in children]
+            pending.append((loc_id, loc_path, loc_type, top, futures))
+
+        location_trees = []
+        for loc_id, loc_path, loc_type, top, futures in pending:
+            for child, future in futures:
+                try:
+                    sub_counters, sub_manifest = future.result()
+                except Exception as e:
+                    print(f"⚠️  Error scanning {child.path}: {e}")
+                    del top.children[child.name]
+                    continue
+                for key, value in sub_counters.items():
+                    counters[key] += value
+                if sub_manifest:
+                    new_manifest.update(sub_manifest)
+                _roll_up(child)
+
+            top.total_entries += top.entries
+            _fingerprint(top)
+            _record_totals([top], new_manifest)
+            count_linked_files(top, link_owners, counters, new_manifest, link_roots)
+            location_trees.append((loc_id, loc_path, loc_type, top))
+
+    return location_trees
+
+
+def _glob_to_regex(pattern):
+    """Translate one gitignore glob; * and ? never match across a /"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
             continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class ExcludeMatcher:
+    """Gitignore-style exclusion rules for one location, compiled once
+
+    Supported syntax: blank lines and # comments, * ? [...] and ** globs, a
+    trailing / for directories only, a leading or inner / to anchor the
+    pattern at the location root (otherwise it matches the name at any
+    depth), and !pattern to re-include anything an exclude rule matched.
+    """
+
+    def __init__(self, root, patterns):
+        self.root = str(root).rstrip(os.sep)
+        self.patterns = []
+        # (negated, dir_only, anchored) -> translated globs
+        groups = {}
+        for raw in patterns:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            self.patterns.append(line)
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if line:
+                groups.setdefault((negated, dir_only, anchored), []).append(_glob_to_regex(line))
+
+        # One combined regex per group, so each entry costs a handful of matches
+        self._rules = [(negated, dir_only, anchored, re.compile("(?:" + "|".join(globs) + r")\Z"))
+                       for (negated, dir_only, anchored), globs in sorted(groups.items())]
+        self._has_anchored = any(anchored for _, _, anchored, _ in self._rules)
+
+    def _matches(self, negated, rel_path, name, is_dir):
+        for rule_negated, dir_only, anchored, regex in self._rules:
+            if rule_negated != negated or (dir_only and not is_dir):
+                continue
+            if regex.match(rel_path if anchored else name):
+                return True
+        return False
+
+    def excluded(self, path, name, is_dir):
+        if not self._rules:
+            return False
+        rel_path = path[len(self.root) + 1:] if self._has_anchored else name
+        if os.sep != "/":
+            rel_path = rel_path.replace(os.sep, "/")
+        return (self._matches(False, rel_path, name, is_dir)
+                and not self._matches(True, rel_path, name, is_dir))
+
+
+def load_exclude_patterns(loc_id, loc_path):
+    """Default rules, then LOCATION_EXCLUDES, then the location's ignore file"""
+    patterns = list(DEFAULT_EXCLUDES) + list(LOCATION_EXCLUDES.get(loc_id, []))
+    ignore_file = Path(loc_path) / IGNORE_FILE_NAME
+    try:
+        patterns += ignore_file.read_text().splitlines()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️  Could not read {ignore_file}: {e}")
+    return patterns
+
+
+def get_exclude_matchers(locations):
+    """Compile the exclusion rules of every location into matchers"""
+    return {loc_id: ExcludeMatcher(loc_path, load_exclude_patterns(loc_id, loc_path))
+            for loc_id, loc_path, loc_type in locations}
+
+
+def scan_rules_key(matchers, symlinks=DEFAULT_SYMLINK_POLICY):
+    """Fingerprint of the active exclusion rules and symlink policy, stored with the manifest"""
+    rules = {loc_id: matcher.patterns for loc_id, matcher in sorted(matchers.items())}
+    rules = {"excludes": rules, "symlinks": symlinks}
+    return hashlib.sha256(json.dumps(rules).encode("utf-8")).hexdigest()
+
 
-        # BUG FIX #5: Add error handling for permission denied and other scanning errors
-        # Without this, the script crashes when encountering protected directories
+def get_manifest_path(output_path):
+    """The directory manifest lives next to knowledge_map_data.json
+
+    Pass the locally built copy: mtimes are specific to this machine and the
+    manifest should not be synced.
+    """
+    return Path(output_path).parent / MANIFEST_NAME
+
+
+class DirManifest(dict):
+    """Per-directory records of a previous run by path, also found by identity
+
+    Records carry the directory's (st_dev, st_ino), so a folder that was
+    renamed or moved within its volume finds its record at the old path.
+    """
+
+    def __init__(self, records=()):
+        super().__init__(records)
+        self.by_ident = {tuple(record["ident"]): path for path, record in self.items()
+                         if record.get("ident")}
+
+    def moved_record(self, path, ident):
+        """The record of directory ident if it was at another path last time, or None"""
+        old_path = self.by_ident.get(ident)
+        if old_path is None or old_path == path:
+            return None
         try:
-            # Count total files in location
-            total_files = sum(1 for f in loc_path.rglob('*') if f.is_file() and not f.name.startswith('.'))
-        except PermissionError:
-            print(f"⚠️  Permission denied accessing {loc_path}")
-            total_files = 0
-        except Exception as e:
-            print(f"⚠️  Error scanning {loc_path}: {e}")
-            total_files = 0
-        
+            st = os.stat(old_path, follow_symlinks=False)
+            if (st.st_dev, st.st_ino) == ident:
+                return None  # still there too (a bind mount): not a move
+        except OSError:
+            pass
+        return self[old_path]
+
+
+def load_manifest(manifest_path, rules=None):
+    """Load per-directory records from a previous run, or {} if unusable
+
+    Records made under different exclusion rules or symlink policy are
+    discarded, since their counts and folder lists no longer apply.
+    """
+    try:
+        with open(manifest_path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable manifest {manifest_path}: {e}")
+        return {}
+    if data.get("version") != MANIFEST_VERSION or data.get("rules") != rules:
+        return {}
+    return DirManifest(data.get("dirs", {}))
+
+
+def save_manifest(manifest, manifest_path, previous=None, rules=None):
+    """Persist per-directory records for the next incremental rescan
+
+    Nothing is written when the records match the previous manifest, so a
+    no-change run writes nothing at all.
+    """
+    if previous is not None and manifest == previous:
+        return
+    try:
+        with atomic_write(manifest_path) as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "generated": datetime.now().isoformat(),
+                "rules": rules,
+                "dirs": manifest
+            }, f, separators=(",", ":"))
+    except OSError as e:
+        # A missing manifest only costs a full rescan next time
+        print(f"⚠️  Could not save manifest {manifest_path}: {e}")
+
+
+def compare_fingerprints(previous, manifest):
+    """Folders moved since the last scan, and groups of identical folders
+
+    A folder whose path is gone but whose fingerprint turns up at a new path
+    was moved (or renamed). Returns (moved, duplicates): moved maps old path
+    to new path, duplicates is a list of path lists. Empty folders are left
+    out, and so is any match whose parent folders already match.
+    """
+    by_fingerprint = {}
+    for path, record in manifest.items():
+        if record.get("total_files") and record.get("fingerprint"):
+            by_fingerprint.setdefault(record["fingerprint"], []).append(path)
+
+    moved = {}
+    for path, record in previous.items():
+        if path in manifest or not record.get("total_files"):
+            continue
+        targets = [p for p in by_fingerprint.get(record.get("fingerprint"), ()) if p not in previous]
+        if targets:
+            moved[path] = min(targets)
+    moved = {old: new for old, new in moved.items()
+             if moved.get(os.path.dirname(old)) != os.path.dirname(new)}
+
+    groups = [sorted(paths) for paths in by_fingerprint.values() if len(paths) > 1]
+    in_group = {path: group[0] for group in groups for path in group}
+    duplicates = []
+    for group in groups:
+        parents = {os.path.dirname(path) for path in group}
+        parent_groups = {in_group.get(parent) for parent in parents}
+        if len(parents) == len(group) and len(parent_groups) == 1 and None not in parent_groups:
+            continue  # one child of folders already reported as identical
+        duplicates.append(group)
+    duplicates.sort(key=lambda group: (-manifest[group[0]]["total_bytes"], group[0]))
+    return moved, duplicates
+
+
+def report_fingerprints(moved, duplicates, limit=5):
+    if not moved and not duplicates:
+        return
+    print(f"🧬 {len(moved)} folders moved since the last scan, "
+          f"{len(duplicates)} sets of identical folders")
+    for old, new in sorted(moved.items())[:limit]:
+        print(f"   ↪️  {old} → {new}")
+    for group in duplicates[:limit]:
+        print(f"   ♊ {' = '.join(group)}")
+
+
+class NodeIds:
+    """Graph node IDs that stay the same from one scan to the next
+
+    A folder's ID is derived from its device and inode, so it survives
+    renames and moves within a volume, and from its normalized path when it
+    cannot be stat-ed. IDs handed out are remembered in path (under
+    NODE_IDS_NAME in the cache directory), which keeps them when the device
+    number changes after a reboot. A move to another volume changes the
+    inode; carry_moves() keeps the ID for the folders compare_fingerprints()
+    matched.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.known = {}     # identity key -> [id, path] from the last saved graph
+        self.carried = {}   # new path -> id of the folder that moved there
+        self.assigned = {}  # identity key -> [id, path] handed out this build
+        self.used = set()
+        if path is not None:
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("version") == NODE_IDS_VERSION:
+                    self.known = data.get("nodes", {})
+            except (OSError, ValueError):
+                pass
+        self.by_path = {entry[1]: key for key, entry in self.known.items()}
+
+    @staticmethod
+    def path_key(path):
+        return "path:" + unicodedata.normalize("NFC", os.path.normpath(path)).casefold()
+
+    @staticmethod
+    def derive(key):
+        return "node_" + hashlib.sha256(key.encode("utf-8", "surrogateescape")).hexdigest()[:12]
+
+    def carry_moves(self, moved):
+        """Keep the IDs of moved folders, and of the folders inside them"""
+        for old, new in moved.items():
+            prefix = old + os.sep
+            for node_id, path in self.known.values():
+                if path == old or path.startswith(prefix):
+                    self.carried[new + path[len(old):]] = node_id
+
+    def begin(self):
+        """Start a new graph build; each ID is given out once per build"""
+        self.assigned = {}
+        self.used = set()
+
+    def assign(self, node):
+        key = f"{node.ident[0]}:{node.ident[1]}" if node.ident else self.path_key(node.path)
+        node_id = self.carried.get(node.path) or (self.known.get(key) or [None])[0]
+        if node_id is None and node.ident:
+            # Same inode at the same path under a new device number
+            previous = self.by_path.get(node.path, "")
+            if previous.rpartition(":")[2] == str(node.ident[1]):
+                node_id = self.known[previous][0]
+        node_id = node_id or self.derive(key)
+        if node_id in self.used:
+            # The same folder reached again through a nested location
+            key = self.path_key(node.path)
+            node_id = self.derive(key)
+        self.used.add(node_id)
+        self.assigned[key] = [node_id, node.path]
+        return node_id
+
+    def save(self):
+        """Remember this build's IDs; nothing is written when they did not change"""
+        if self.path is None or self.assigned == self.known:
+            return
+        try:
+            with atomic_write(self.path) as f:
+                json.dump({"version": NODE_IDS_VERSION, "nodes": self.assigned}, f, separators=(",", ":"))
+        except OSError as e:
+            print(f"⚠️  Could not save node IDs {self.path}: {e}")
+            return
+        self.known = self.assigned
+        self.by_path = {entry[1]: key for key, entry in self.known.items()}
+
+
+def categorize_folder(name):
+    """Determine the graph category for a top-level folder name"""
+    if "_AUTOMATION" in name:
+        return "system"
+    elif "Career" in name or "Professional" in name:
+        return "professional"
+    elif "Education" in name or "Course" in name:
+        return "education"
+    elif "Research" in name or "AI" in name:
+        return "research"
+    elif "Technical" in name or "Development" in name:
+        return "technical"
+    elif "_ORGANIZED" in name:
+        return "system"
+    return "general"
+
+
+def build_graph(location_trees, node_ids=None):
+    """Emit nodes and links from aggregated location trees
+
+    location_trees is a list of (loc_id, loc_path, loc_type, tree) tuples.
+    A None tree means the location could not be scanned. Folder IDs come
+    from node_ids (a NodeIds), so they are stable across runs.
+    """
+    nodes = []
+    links = []
+    if node_ids is None:
+        node_ids = NodeIds()
+    node_ids.begin()
+
+    for loc_id, loc_path, loc_type, tree in location_trees:
+        total_files = tree.files if tree is not None else 0
+
         # Add location node
-        node_map[str(loc_path)] = loc_id
         nodes.append({
             "id": loc_id,
-            "name": loc_path.name,
+            "name": Path(loc_path).name,
             "category": loc_type,
             "files": total_files,
+            "bytes": tree.bytes if tree is not None else 0,
             "size": min(40, max(10, total_files // 20)),
             "path": str(loc_path)
         })
-        
-        # Scan subdirectories
-        for subdir in loc_path.iterdir():
-            if subdir.is_dir() and not subdir.name.startswith('.'):
-                # BUG FIX #5: Error handling for subdirectory scanning
-                try:
-                    file_count = sum(1 for f in subdir.rglob('*') if f.is_file() and not f.name.startswith('.'))
-                except PermissionError:
-                    print(f"⚠️  Permission denied accessing {subdir}")
-                    continue  # Skip this subdirectory
-                except Exception as e:
-                    print(f"⚠️  Error scanning {subdir}: {e}")
-                    continue  # Skip this subdirectory
-                
-                if file_count > 0:
-                    sub_id = f"node_{node_id}"
-                    node_id += 1
-                    
-                    # Determine category
-                    category = "general"
-                    if "_AUTOMATION" in subdir.name:
-                        category = "system"
-                    elif "Career" in subdir.name or "Professional" in subdir.name:
-                        category = "professional"
-                    elif "Education" in subdir.name or "Course" in subdir.name:
-                        category = "education"
-                    elif "Research" in subdir.name or "AI" in subdir.name:
-                        category = "research"
-                    elif "Technical" in subdir.name or "Development" in subdir.name:
-                        category = "technical"
-                    elif "_ORGANIZED" in subdir.name:
-                        category = "system"
-                    
-                    nodes.append({
-                        "id": sub_id,
-                        "name": subdir.name,
-                        "category": category,
-                        "files": file_count,
-                        "size": min(30, max(5, file_count // 5)),
-                        "path": str(subdir)
-                    })
-                    
-                    # Link to parent
-                    links.append({
-                        "source": loc_id,
-                        "target": sub_id,
-                        "strength": 0.8
-                    })
-                    
-                    # Scan one more level deep for important folders
-                    if subdir.name in ["_AUTOMATION", "_ORGANIZED", "Projects_By_Topic"]:
-                        for subsubdir in subdir.iterdir():
-                            if subsubdir.is_dir() and not subsubdir.name.startswith('.'):
-                                # BUG FIX #5: Error handling for deep subdirectory scanning
-                                try:
-                                    subfile_count = sum(1 for f in subsubdir.rglob('*') if f.is_file())
-                                except PermissionError:
-                                    print(f"⚠️  Permission denied accessing {subsubdir}")
-                                    continue  # Skip this deep subdirectory
-                                except Exception as e:
-                                    print(f"⚠️  Error scanning {subsubdir}: {e}")
-                                    continue  # Skip this deep subdirectory
-                                
-                                if subfile_count > 0:
-                                    subsub_id = f"node_{node_id}"
-                                    node_id += 1
-                                    
-                                    nodes.append({
-                                        "id": subsub_id,
-                                        "name": subsubdir.name,
-                                        "category": category,
-                                        "files": subfile_count,
-                                        "size": min(20, max(5, subfile_count // 3)),
-                                        "path": str(subsubdir)
-                                    })
-                                    
-                                    links.append({
-                                        "source": sub_id,
-                                        "target": subsub_id,
-                                        "strength": 0.7
-                                    })
-    
-    # Add semantic relationships
-    for i, n1 in enumerate(nodes):
-        for n2 in nodes[i+1:]:
-            # Check for related topics
-            keywords = ['ai', 'research', 'career', 'oxford', 'technical', 'project']
-            if any(k in n1['name'].lower() and k in n2['name'].lower() for k in keywords):
+
+        if tree is None:
+            continue
+
+        # Subdirectories
+        for subdir in tree.sorted_children():
+            if subdir.name.startswith('.') or subdir.files == 0:
+                continue
+
+            sub_id = node_ids.assign(subdir)
+            category = categorize_folder(subdir.name)
+
+            nodes.append({
+                "id": sub_id,
+                "name": subdir.name,
+                "category": category,
+                "files": subdir.files,
+                "bytes": subdir.bytes,
+                "size": min(30, max(5, subdir.files // 5)),
+                "path": subdir.path
+            })
+
+            # Link to parent
+            links.append({
+                "source": loc_id,
+                "target": sub_id,
+                "strength": 0.8
+            })
+
+            # One more level deep for important folders
+            if subdir.name not in IMPORTANT_FOLDERS:
+                continue
+
+            for subsubdir in subdir.sorted_children():
+                if subsubdir.name.startswith('.'):
+                    continue
+                # Deep folders have always counted dot-named files too
+                subfile_count = subsubdir.files + subsubdir.hidden_files
+                if subfile_count == 0:
+                    continue
+
+                subsub_id = node_ids.assign(subsubdir)
+
+                nodes.append({
+                    "id": subsub_id,
+                    "name": subsubdir.name,
+                    "category": category,
+                    "files": subfile_count,
+                    "bytes": subsubdir.bytes,
+                    "size": min(20, max(5, subfile_count // 3)),
+                    "path": subsubdir.path
+                })
+
                 links.append({
-                    "source": n1['id'],
-                    "target": n2['id'],
-                    "strength": 0.3
+                    "source": sub_id,
+                    "target": subsub_id,
+                    "strength": 0.7
                 })
+
+    return nodes, links
+
+
+def _is_within(path, root):
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def plan_scan_roots(locations):
+    """Split locations into directories to walk and locations nested inside them
+
+    Paths are compared after resolving symlinks, so the same folder reached
+    through two names, or a folder inside another location, is recognised.
+    Returns (walk_locations, nested) where nested holds
+    (location, walk loc_id, relative path parts) for every location that lies
+    inside a walked one, or is the same directory.
+    """
+    existing = []
+    for location in locations:
+        if location[1].exists():
+            existing.append((os.path.realpath(location[1]), location))
+
+    walk_locations = []
+    walk_roots = []   # (real path, loc_id)
+    nested = []
+    # Shorter real paths first, so enclosing roots are seen before their contents
+    for real_path, location in sorted(existing, key=lambda item: (len(item[0]), item[0])):
+        for walk_real, walk_id in walk_roots:
+            if _is_within(real_path, walk_real):
+                rel = os.path.relpath(real_path, walk_real)
+                parts = [] if rel == os.curdir else rel.split(os.sep)
+                nested.append((location, walk_id, parts))
+                break
+        else:
+            walk_roots.append((real_path, location[0]))
+            walk_locations.append(location)
+
+    # Keep the caller's order for walks, it decides the order of graph nodes
+    order = {location[0]: index for index, location in enumerate(locations)}
+    walk_locations.sort(key=lambda location: order[location[0]])
+    return walk_locations, nested
+
+
+def _find_descendant(tree, parts):
+    node = tree
+    for part in parts:
+        node = node.children.get(part)
+        if node is None:
+            return None
+    return node
+
+
+def _hard_link_keys(links):
+    """(dev, ino) of the files with several hard links among a folder's links"""
+    # target is only recorded for single-link files reached by symlink
+    return {(dev, ino) for dev, ino, size, hidden, target, placeholder in links if target is None}
+
+
+def _stale_plain_counts(nodes, keys, links=False):
+    """Paths of the folders that count one of keys directly, as a single-link file
+
+    Such a folder was not listed again: the file had one link when it was,
+    and a link added in another folder does not change this folder's mtime.
+    With links, folders holding one of keys among their links are included.
+    """
+    return {node.path for node in nodes
+            if (node.ident and any((node.ident[0], ino) in keys for ino in node.inodes))
+            or (links and any((dev, ino) in keys for dev, ino, *_ in node.links))}
+
+
+def scan_locations(locations, counters=None, manifest=None, new_manifest=None,
+                   workers=1, cloud_workers=DEFAULT_CLOUD_WORKERS, matchers=None,
+                   symlinks=DEFAULT_SYMLINK_POLICY, link_owners=None):
+    """Aggregate every existing location with a single walk each
+
+    With workers > 1 the walk is spread over a thread pool. matchers maps
+    location ids to their ExcludeMatcher (compiled from the defaults when None).
+    symlinks is one of SYMLINK_POLICIES. link_owners, if given, is filled with
+    the folder each hard-linked or symlinked file was counted in.
+
+    Overlapping locations share one walk: a location inside another one (or
+    the same directory under another name) reuses the aggregate of that
+    folder from the enclosing walk, so each physical directory is visited
+    once and its counts are attributed to every location containing it.
+    Exclusion rules of the enclosing location apply to the shared walk.
+
+    A folder reused from the manifest that still counts a file which has
+    since gained a hard link in a re-listed folder would count that file
+    twice. Such folders are found after the walk, and the scan is repeated
+    once with only them left out of the manifest (this run's records stand
+    in for the rest, so nothing else is listed again).
+    """
+    if counters is None:
+        counters = new_scan_counters()
+    if matchers is None:
+        matchers = get_exclude_matchers(locations)
+    if link_owners is None:
+        link_owners = {}
+
+    trees = _scan_locations_once(locations, counters, manifest, new_manifest, workers,
+                                 cloud_workers, matchers, symlinks, link_owners)
+    if not manifest:
+        return trees
+    nodes = {node.path: node for _, _, _, tree in trees if tree is not None
+             for node in _iter_subtree(tree)}.values()
+    hard_links = set().union(*(_hard_link_keys(node.links) for node in nodes))
+    stale = _stale_plain_counts(nodes, hard_links) if hard_links else set()
+    if not stale:
+        return trees
+
+    first = dict(counters)
+    records = new_manifest if new_manifest is not None else manifest
+    records = {path: record for path, record in records.items() if path not in stale}
+    counters.clear()
+    counters.update(new_scan_counters())
+    if new_manifest is not None:
+        new_manifest.clear()
+    link_owners.clear()
+    trees = _scan_locations_once(locations, counters, records, new_manifest, workers,
+                                 cloud_workers, matchers, symlinks, link_owners)
+    # Report the work of both passes against the previous run's manifest
+    for key in ("stat_calls", "listed_dirs"):
+        counters[key] += first[key]
+    counters["reused_dirs"] = first["reused_dirs"] - len(stale)
+    counters["moved_dirs"] = first["moved_dirs"]
+    counters["relinked_dirs"] = len(stale)
+    return trees
+
+
+def _scan_locations_once(locations, counters, manifest, new_manifest, workers, cloud_workers,
+                         matchers, symlinks, link_owners):
+    """One pass of scan_locations()"""
+    walk_locations, nested = plan_scan_roots(locations)
+    link_roots = [os.path.realpath(loc_path) for _, loc_path, _ in walk_locations]
+
+    if workers > 1:
+        walked = scan_locations_parallel(walk_locations, counters, manifest, new_manifest,
+                                         workers, cloud_workers, matchers, symlinks, link_owners,
+                                         link_roots)
+    else:
+        walked = []
+        for loc_id, loc_path, loc_type in walk_locations:
+            try:
+                tree = aggregate_directory(loc_path, counters, manifest, new_manifest,
+                                           matchers.get(loc_id), symlinks, link_owners, link_roots)
+            except Exception as e:
+                print(f"⚠️  Error scanning {loc_path}: {e}")
+                tree = None
+            walked.append((loc_id, loc_path, loc_type, tree))
+
+    trees = {loc_id: tree for loc_id, _, _, tree in walked}
+    for (loc_id, loc_path, loc_type), walk_id, parts in nested:
+        outer = trees.get(walk_id)
+        node = _find_descendant(outer, parts) if outer is not None else None
+        if node is None:
+            # Excluded or unreadable in the enclosing walk: walk it on its own
+            try:
+                node = aggregate_directory(loc_path, counters, manifest, new_manifest,
+                                           matchers.get(loc_id), symlinks, link_owners, link_roots)
+            except Exception as e:
+                print(f"⚠️  Error scanning {loc_path}: {e}")
+        else:
+            counters["nested_roots"] += 1
+        trees[loc_id] = node
+
+    return [(loc_id, loc_path, loc_type, trees[loc_id])
+            for loc_id, loc_path, loc_type in locations if loc_id in trees]
+
+
+def build_semantic_links(nodes, keywords=SEMANTIC_KEYWORDS,
+                         max_links_per_node=DEFAULT_MAX_SEMANTIC_LINKS):
+    """Link nodes whose names share a topic keyword
+
+    Keyword-to-node posting lists are built in one pass, and pairs are only
+    drawn from within a posting list. With max_links_per_node set, each node
+    is paired with at most that many of the next nodes in each of its
+    posting lists and takes part in at most that many semantic links, so a
+    common keyword grows the link count linearly. None or 0 links every
+    matching pair, in the same order as the old pairwise loop.
+    """
+    postings = {keyword: [] for keyword in keywords}
+    node_keywords = []
+    for index, node in enumerate(nodes):
+        name = node['name'].lower()
+        matched = [keyword for keyword in keywords if keyword in name]
+        node_keywords.append(matched)
+        for keyword in matched:
+            postings[keyword].append(index)
+
+    limit = max_links_per_node or None
+    degree = [0] * len(nodes)
+    links = []
+
+    for i, matched in enumerate(node_keywords):
+        candidates = set()
+        for keyword in matched:
+            posting = postings[keyword]
+            start = bisect_right(posting, i)
+            end = len(posting) if limit is None else start + limit
+            candidates.update(posting[start:end])
+
+        for j in sorted(candidates):
+            if limit is not None:
+                if degree[i] >= limit:
+                    break
+                if degree[j] >= limit:
+                    continue
+            degree[i] += 1
+            degree[j] += 1
+            links.append({
+                "source": nodes[i]['id'],
+                "target": nodes[j]['id'],
+                "strength": 0.3
+            })
+
+    return links
+
+
+def scan_file_system(manifest=None, new_manifest=None, counters=None,
+                     workers=1, cloud_workers=DEFAULT_CLOUD_WORKERS,
+                     max_semantic_links=DEFAULT_MAX_SEMANTIC_LINKS, matchers=None,
+                     symlinks=DEFAULT_SYMLINK_POLICY, node_ids=None):
+    """Scan and generate current file system data
+
+    Pass the manifest from the previous run to rescan incrementally; records
+    for this run are collected into new_manifest. workers > 1 scans the
+    locations and their first-level subtrees concurrently. Each physical file
+    is counted once however many hard links or symlinks reach it.
+    """
+    
+    location_trees = scan_locations(get_scan_locations(), counters, manifest, new_manifest,
+                                    workers, cloud_workers, matchers, symlinks)
+    return graph_from_trees(location_trees, max_semantic_links, node_ids)
+
+
+def graph_from_trees(location_trees, max_semantic_links=DEFAULT_MAX_SEMANTIC_LINKS, node_ids=None):
+    """Build the output document from aggregated location trees"""
+    nodes, links = build_graph(location_trees, node_ids)
+    
+    # Add semantic relationships
+    links.extend(build_semantic_links(nodes, max_links_per_node=max_semantic_links))
     
     return {
         "nodes": nodes,
@@ -150,13 +1298,92 @@ def scan_file_system():
         "total_files": sum(n['files'] for n in nodes)
     }
 
-def save_data(data, output_path):
-    """Save data to JSON file"""
+@contextmanager
+def atomic_write(path, binary=False):
+    """Write to a temp file next to path and rename it over path on success
+
+    Readers (and iCloud) only ever see the old file or the complete new one.
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_json_stream(write, data, compact=False):
+    """Emit data as JSON, one node or link at a time
+
+    Produces the same document as json.dump(data, indent=2), or a
+    whitespace-free one in compact mode, without building it in memory.
+    """
+    if compact:
+        separators = (",", ":")
+        first_item, item_sep, close_list = "", ",", "]"
+        open_doc, key_sep, close_doc = "{", ",", "}"
+    else:
+        separators = (",", ": ")
+        first_item, item_sep, close_list = "\n", ",\n", "\n  ]"
+        open_doc, key_sep, close_doc = "{\n", ",\n", "\n}"
+
+    write(open_doc)
+    for key_index, (key, value) in enumerate(data.items()):
+        if key_index:
+            write(key_sep)
+        prefix = "" if compact else "  "
+        write(f"{prefix}{json.dumps(key)}{separators[1]}")
+
+        if key in ("nodes", "links"):
+            write("[")
+            empty = True
+            for item_index, item in enumerate(value):
+                write(item_sep if item_index else first_item)
+                if compact:
+                    write(json.dumps(item, separators=separators))
+                else:
+                    text = json.dumps(item, indent=2, separators=separators)
+                    write("    " + text.replace("\n", "\n    "))
+                empty = False
+            write("]" if empty else close_list)
+        else:
+            write(json.dumps(value, separators=separators))
+    write(close_doc)
+
+
+def save_data(data, output_path, compact=False, gzip_sidecar=False):
+    """Save data to JSON file
+
+    The file is streamed to a temp file and renamed into place. compact drops
+    all whitespace; gzip_sidecar also writes <output>.gz in the same pass.
+    """
     # BUG FIX #7: Add error handling for file write failures
     # This prevents silent failures when disk is full or permissions are wrong
     try:
-        with open(output_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        with ExitStack() as stack:
+            f = stack.enter_context(atomic_write(output_path))
+            writers = [f.write]
+            if gzip_sidecar:
+                raw = stack.enter_context(atomic_write(f"{output_path}.gz", binary=True))
+                # mtime=0 keeps the archive byte-identical for identical data
+                gz = stack.enter_context(gzip.GzipFile(fileobj=raw, mode='wb', mtime=0))
+                gz_text = stack.enter_context(io.TextIOWrapper(gz, encoding='utf-8'))
+                writers.append(gz_text.write)
+
+            def write(chunk):
+                for writer in writers:
+                    writer(chunk)
+
+            _write_json_stream(write, data, compact)
         print(f"✓ Saved {len(data['nodes'])} nodes, {data['total_files']} total files")
     except PermissionError:
         print(f"❌ Permission denied writing to {output_path}")
@@ -170,13 +1397,576 @@ def save_data(data, output_path):
         print(f"❌ Unexpected error saving data: {e}")
         raise  # Re-raise to let caller know the save failed
 
+def get_cache_dir():
+    """Local (never synced) directory where output is built before publishing"""
+    system = platform.system()
+    home = Path.home()
+
+    if system == "Darwin":  # macOS
+        return home / "Library" / "Caches" / "knowledge_map"
+    elif system == "Windows":
+        return Path(os.environ.get("LOCALAPPDATA", home / "AppData" / "Local")) / "knowledge_map"
+    else:  # Linux
+        return Path(os.environ.get("XDG_CACHE_HOME", home / ".cache")) / "knowledge_map"
+
+
+def graph_content_hash(data):
+    """SHA-256 of the graph without volatile fields such as the timestamp"""
+    digest = hashlib.sha256()
+    stable = {key: value for key, value in data.items() if key not in VOLATILE_FIELDS}
+    _write_json_stream(lambda chunk: digest.update(chunk.encode('utf-8')), stable, compact=True)
+    return digest.hexdigest()
+
+
+def _load_publish_state(state_path):
+    try:
+        with open(state_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _copy_atomic(source, destination):
+    with open(source, 'rb') as src, atomic_write(destination, binary=True) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def publish_data(data, output_path, cache_dir, compact=False, gzip_sidecar=False):
+    """Build output in cache_dir and copy it to output_path only if the graph changed
+
+    Every run rewrites the file because of the `generated` timestamp, which
+    makes iCloud re-upload it to every device. The graph is compared by a hash
+    that ignores volatile fields; an unchanged graph is left alone.
+    Returns the number of bytes of sync avoided by this run.
+    """
+    output_path = Path(output_path)
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    cached_output = cache_dir / output_path.name
+    save_data(data, cached_output, compact=compact, gzip_sidecar=gzip_sidecar)
+
+    artifacts = [(cached_output, output_path)]
+    if gzip_sidecar:
+        artifacts.append((Path(f"{cached_output}.gz"), Path(f"{output_path}.gz")))
+    artifact_bytes = sum(source.stat().st_size for source, _ in artifacts)
+
+    state_path = cache_dir / PUBLISH_STATE_NAME
+    state = _load_publish_state(state_path)
+    content_hash = graph_content_hash(data)
+    publish_format = {"compact": compact, "gzip": gzip_sidecar}
+
+    unchanged = (state.get("content_hash") == content_hash
+                 and state.get("format") == publish_format
+                 and state.get("published_to") == str(output_path)
+                 and all(destination.exists() for _, destination in artifacts))
+
+    if unchanged:
+        avoided = artifact_bytes
+        print(f"☁️  Graph unchanged - skipped publishing to {output_path.parent}")
+    else:
+        # BUG FIX #7: same error reporting as save_data for the synced copy
+        try:
+            for source, destination in artifacts:
+                _copy_atomic(source, destination)
+        except OSError as e:
+            print(f"❌ Error publishing to {output_path}: {e}")
+            raise
+        avoided = 0
+        print(f"☁️  Published {artifact_bytes:,} bytes to {output_path.parent}")
+
+    state.update({
+        "content_hash": content_hash,
+        "format": publish_format,
+        "published_to": str(output_path),
+        "bytes_avoided_total": state.get("bytes_avoided_total", 0) + avoided,
+    })
+    if not unchanged:
+        state["published_at"] = datetime.now().isoformat()
+    with atomic_write(state_path) as f:
+        json.dump(state, f, indent=2)
+
+    print(f"   Sync avoided: {avoided:,} bytes this run, "
+          f"{state['bytes_avoided_total']:,} bytes total")
+    return avoided
+
+
+class InotifyWatcher:
+    """Directory change notifications from Linux inotify, via ctypes"""
+
+    MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+            | IN_ONLYDIR | IN_DONT_FOLLOW)
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths = {}    # watch descriptor -> directory
+        self._watches = {}  # directory -> watch descriptor
+        self._limit_warned = False
+        self.overflowed = False
+        self.kind = "inotify"
+
+    def add(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            if ctypes.get_errno() == errno.ENOSPC and not self._limit_warned:
+                print("⚠️  inotify watch limit reached, some folders are not watched")
+                print("   Raise fs.inotify.max_user_watches or use --poll")
+                self._limit_warned = True
+            return
+        self._paths[wd] = path
+        self._watches[path] = wd
+
+    def remove(self, path):
+        wd = self._watches.pop(path, None)
+        if wd is not None:
+            self._paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def poll(self, timeout):
+        """Directories that changed, waiting up to timeout seconds (None blocks)"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        dirty = set()
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _cookie, length = self._EVENT.unpack_from(buf, offset)
+                offset += self._EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    continue
+                path = self._paths.get(wd)
+                if path is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # Watched directory was deleted; its parent reports the removal
+                    del self._paths[wd]
+                    self._watches.pop(path, None)
+                    continue
+                dirty.add(path)
+        return dirty
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Adaptive directory mtime polling where inotify is not available
+
+    Polls quickly right after a change and backs off while the tree is quiet.
+    Only catches changes that touch a directory's mtime (new, removed and
+    renamed entries), not in-place edits.
+    """
+
+    def __init__(self, index, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL):
+        self._index = index
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.overflowed = False
+        self.kind = "polling"
+
+    def add(self, path):
+        pass  # polls every directory in the index
+
+    def remove(self, path):
+        pass
+
+    def poll(self, timeout):
+        """Directories that changed, after sleeping timeout or the adaptive interval"""
+        time.sleep(self.interval if timeout is None else timeout)
+        dirty = {path for path, node in list(self._index.items())
+                 if _directory_mtime(path) != node.mtime}
+        if timeout is None:
+            if dirty:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.max_interval, self.interval * 1.5)
+        return dirty
+
+    def close(self):
+        pass
+
+
+def create_watcher(index, force_poll=False):
+    if not force_poll and platform.system() == "Linux":
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(index)
+
+
+def _iter_subtree(node):
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(current.children.values())
+
+
+def _release_links(node, link_owners):
+    for dev, ino, *_ in node.links:
+        if link_owners.get((dev, ino)) == node.path:
+            del link_owners[(dev, ino)]
+
+
+def patch_directory(node, index, watcher, counters, manifest, matcher=None,
+                    symlinks=DEFAULT_SYMLINK_POLICY, link_owners=None, link_roots=None):
+    """Re-list one changed directory and push the difference up to the root
+
+    Known subdirectories keep their aggregates, new ones are scanned, and
+    removed ones are dropped together with their watches and manifest records.
+    A linked file this folder stops holding is released; another link to it
+    elsewhere is counted once that folder changes or on the next full scan.
+    Returns the (dev, ino) of files that became hard links here or that this
+    folder no longer holds, so the other folders holding them can be patched
+    too.
+    """
+    if link_owners is None:
+        link_owners = {}
+    if link_roots is None:
+        link_roots = [os.path.realpath(path) for path in index if index[path].parent is None]
+    fresh = DirStats(node.path, node.parent, _directory_mtime(node.path), node.ident)
+    fresh.linked = node.linked
+    before = [counters[key] for key in DIR_COUNTERS]
+    if fresh.mtime is None or not _list_directory(fresh, [], counters, matcher, symlinks):
+        return set()  # directory is gone; its parent handles the removal
+    listed = {key: counters[key] - start for key, start in zip(DIR_COUNTERS, before)}
+
+    _release_links(node, link_owners)
+    for name, child in node.children.items():
+        if name not in fresh.children:
+            for gone in _iter_subtree(child):
+                index.pop(gone.path, None)
+                manifest.pop(gone.path, None)
+                watcher.remove(gone.path)
+                _release_links(gone, link_owners)
+
+    children = {}
+    for name, fresh_child in fresh.children.items():
+        existing = node.children.get(name)
+        if existing is not None:
+            children[name] = existing
+            continue
+        fresh_child.parent = node
+        for added in _walk_subtree(fresh_child, counters, {}, manifest, matcher, symlinks):
+            index[added.path] = added
+            watcher.add(added.path)
+        count_linked_files(fresh_child, link_owners, counters, manifest, link_roots)
+        children[name] = fresh_child
+
+    manifest[node.path] = record = {
+        "mtime": fresh.mtime,
+        "entries": fresh.entries,
+        "files": fresh.files,
+        "hidden_files": fresh.hidden_files,
+        "bytes": fresh.bytes,
+        "dirs": sorted(children),
+        "links": fresh.links,
+        "inodes": fresh.inodes,
+        "files_fingerprint": fresh.files_fingerprint,
+        **listed,
+    }
+    if fresh.ident is not None and not fresh.linked:
+        record["ident"] = list(fresh.ident)
+
+    # Count the linked files here that no other live folder has counted
+    for dev, ino, size, hidden, target, placeholder in fresh.links:
+        owner = link_owners.get((dev, ino))
+        if (owner is not None and owner in index) or \
+                (target is not None and any(_is_within(target, root) for root in link_roots)):
+            counters["duplicate_links"] += 1
+            continue
+        link_owners[(dev, ino)] = node.path
+        if placeholder:
+            counters["placeholders"] += 1
+        if hidden:
+            fresh.hidden_files += 1
+        else:
+            fresh.files += 1
+            fresh.bytes += size
+
+    totals = [fresh.entries, fresh.files, fresh.hidden_files, fresh.bytes]
+    for child in children.values():
+        totals[0] += child.total_entries
+        totals[1] += child.files
+        totals[2] += child.hidden_files
+        totals[3] += child.bytes
+    delta = [totals[0] - node.total_entries, totals[1] - node.files,
+             totals[2] - node.hidden_files, totals[3] - node.bytes]
+
+    changed_links = ((_hard_link_keys(fresh.links) - _hard_link_keys(node.links))
+                     | ({(dev, ino) for dev, ino, *_ in node.links}
+                        - {(dev, ino) for dev, ino, *_ in fresh.links}))
+    node.children = children
+    node.mtime = fresh.mtime
+    node.links = fresh.links
+    node.inodes = fresh.inodes
+    node.files_fingerprint = fresh.files_fingerprint
+
+    ancestor = node
+    while ancestor is not None:
+        ancestor.total_entries += delta[0]
+        ancestor.files += delta[1]
+        ancestor.hidden_files += delta[2]
+        ancestor.bytes += delta[3]
+        _fingerprint(ancestor)
+        _record_totals([ancestor], manifest)
+        ancestor = ancestor.parent
+    return changed_links
+
+
+def watch(output, manifest_path, cache_dir, full=False, force_poll=False,
+          workers=DEFAULT_SCAN_WORKERS, cloud_workers=DEFAULT_CLOUD_WORKERS,
+          max_semantic_links=DEFAULT_MAX_SEMANTIC_LINKS, compact=False, gzip_sidecar=False,
+          symlinks=DEFAULT_SYMLINK_POLICY):
+    """Keep the graph live: scan once, then patch changed directories and republish"""
+    publish = lambda data: publish_data(data, output, cache_dir, compact, gzip_sidecar)
+    FILE_HASHES.update(load_file_hashes(cache_dir))
+    node_ids = NodeIds(Path(cache_dir) / NODE_IDS_NAME)
+
+    locations = get_scan_locations()
+    matchers = get_exclude_matchers(locations)
+    rules = scan_rules_key(matchers, symlinks)
+    root_matchers = {str(loc_path): matchers[loc_id] for loc_id, loc_path, _ in locations}
+    link_roots = [os.path.realpath(loc_path) for _, loc_path, _ in plan_scan_roots(locations)[0]]
+
+    def initial_scan():
+        previous = {} if full else load_manifest(manifest_path, rules)
+        manifest = {}
+        link_owners = {}
+        trees = scan_locations(locations, new_scan_counters(), previous, manifest,
+                               workers, cloud_workers, matchers, symlinks, link_owners)
+        node_ids.carry_moves(compare_fingerprints(previous, manifest)[0])
+        index = {node.path: node for _, _, _, tree in trees if tree is not None
+                 for node in _iter_subtree(tree)}
+        return trees, index, manifest, link_owners
+
+    location_trees, index, manifest, link_owners = initial_scan()
+    data = graph_from_trees(location_trees, max_semantic_links, node_ids)
+    publish(data)
+    node_ids.save()
+    save_manifest(manifest, manifest_path, rules=rules)
+    last_hash = graph_content_hash(data)
+
+    watcher = create_watcher(index, force_poll)
+    for path in index:
+        watcher.add(path)
+    print(f"👀 Watching {len(index)} directories ({watcher.kind}), Ctrl+C to stop")
+
+    try:
+        while True:
+            dirty = watcher.poll(None)
+            if not dirty and not watcher.overflowed:
+                continue
+
+            # Debounce: collect the rest of the burst, but publish at least
+            # every WATCH_MAX_BATCH_WAIT seconds while it lasts
+            deadline = time.monotonic() + WATCH_MAX_BATCH_WAIT
+            while time.monotonic() < deadline:
+                more = watcher.poll(WATCH_DEBOUNCE)
+                if not more:
+                    break
+                dirty |= more
+
+            counters = new_scan_counters()
+            if watcher.overflowed:
+                print("⚠️  Event queue overflowed, rescanning")
+                watcher.overflowed = False
+                save_manifest(manifest, manifest_path, rules=rules)
+                location_trees, new_index, manifest, link_owners = initial_scan()
+                for path in new_index.keys() - index.keys():
+                    watcher.add(path)
+                index.clear()
+                index.update(new_index)
+            else:
+                def patch(node):
+                    root = node
+                    while root.parent is not None:
+                        root = root.parent
+                    return patch_directory(node, index, watcher, counters, manifest,
+                                           root_matchers.get(root.path), symlinks, link_owners,
+                                           link_roots)
+
+                # Deepest first, so parents see their children's new totals
+                changed_links = set()
+                for path in sorted(dirty, key=lambda p: p.count(os.sep), reverse=True):
+                    node = index.get(path)
+                    if node is not None:
+                        changed_links |= patch(node)
+                # Adding or removing a hard link does not touch the folders
+                # holding the file's other names, so patch those as well
+                if changed_links:
+                    others = _stale_plain_counts(list(index.values()), changed_links, links=True)
+                    for path in sorted(others - dirty):
+                        if path in index:
+                            patch(index[path])
+
+            data = graph_from_trees(location_trees, max_semantic_links, node_ids)
+            content_hash = graph_content_hash(data)
+            if content_hash != last_hash:
+                print(f"🔄 {len(dirty)} folders changed, {counters['listed_dirs']} re-listed")
+                publish(data)
+                node_ids.save()
+                save_manifest(manifest, manifest_path, rules=rules)
+                last_hash = content_hash
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
+def legacy_stat_calls(tree):
+    """Number of is_file()/is_dir() stat calls the rglob scanner made for a tree
+
+    The old scanner ran rglob over the location, again over each child and a
+    third time over each child of an important folder, stat-ing every entry
+    (plus one is_dir() check on the root of every rglob pass).
+    """
+    calls = 1 + tree.total_entries + tree.entries
+    for subdir in tree.children.values():
+        if subdir.name.startswith('.'):
+            continue
+        calls += 1 + subdir.total_entries
+        if subdir.name in IMPORTANT_FOLDERS and subdir.files > 0:
+            calls += subdir.entries
+            for subsubdir in subdir.children.values():
+                if not subsubdir.name.startswith('.'):
+                    calls += 1 + subsubdir.total_entries
+    return calls
+
+
+def _legacy_walk(path):
+    """Re-run the old rglob counting passes for timing comparisons"""
+    sum(1 for f in path.rglob('*') if f.is_file() and not f.name.startswith('.'))
+    for subdir in path.iterdir():
+        if subdir.is_dir() and not subdir.name.startswith('.'):
+            sum(1 for f in subdir.rglob('*') if f.is_file() and not f.name.startswith('.'))
+            if subdir.name in IMPORTANT_FOLDERS:
+                for subsubdir in subdir.iterdir():
+                    if subsubdir.is_dir() and not subsubdir.name.startswith('.'):
+                        sum(1 for f in subsubdir.rglob('*') if f.is_file())
+
+
+def run_benchmark(locations):
+    """Compare the single-pass scanner against the old rglob passes"""
+    print("⏱️  Scanner benchmark")
+    print("=" * 40)
+
+    for loc_id, loc_path, loc_type in locations:
+        if not loc_path.exists():
+            continue
+
+        counters = new_scan_counters()
+        start = time.perf_counter()
+        tree = aggregate_directory(loc_path, counters)
+        new_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _legacy_walk(loc_path)
+        old_time = time.perf_counter() - start
+
+        old_calls = legacy_stat_calls(tree)
+        saved = old_calls - counters["stat_calls"]
+
+        print(f"\n📁 {loc_path}")
+        print(f"   Directories: {counters['dirs']}, files: {tree.files}")
+        print(f"   rglob scanner:       {old_calls:>10} stat calls  {old_time:8.2f}s")
+        print(f"   single-pass scanner: {counters['stat_calls']:>10} stat calls  {new_time:8.2f}s")
+        print(f"   Saved {saved} stat calls ({saved / max(old_calls, 1):.0%})")
+
+
 if __name__ == "__main__":
-    # Generate data
-    data = scan_file_system()
-    
-    # Save to iCloud Documents
+    parser = argparse.ArgumentParser(description="Generate knowledge map data")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare single-pass scanning against the old rglob scanner")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore the directory manifest and rescan everything")
+    parser.add_argument("--workers", type=int, default=DEFAULT_SCAN_WORKERS,
+                        help="scanner threads, 1 scans sequentially (default: %(default)s)")
+    parser.add_argument("--cloud-workers", type=int, default=DEFAULT_CLOUD_WORKERS,
+                        help="max threads on iCloud and network mounts (default: %(default)s)")
+    parser.add_argument("--max-semantic-links", type=int, default=DEFAULT_MAX_SEMANTIC_LINKS,
+                        help="cap on keyword links per node, 0 for no cap (default: %(default)s)")
+    parser.add_argument("--compact", action="store_true",
+                        help="write JSON without indentation")
+    parser.add_argument("--gzip", action="store_true",
+                        help="also write a knowledge_map_data.json.gz sidecar")
+    parser.add_argument("--cache-dir", type=Path, default=get_cache_dir(),
+                        help="local build directory for output (default: %(default)s)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and republish the graph as folders change")
+    parser.add_argument("--poll", action="store_true",
+                        help="in watch mode, poll directory mtimes instead of using inotify")
+    parser.add_argument("--follow-symlinks", choices=SYMLINK_POLICIES, default=DEFAULT_SYMLINK_POLICY,
+                        help="count symlinked files (files), also descend into symlinked "
+                             "folders (all), or neither (never) (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(get_scan_locations())
+        sys.exit(0)
+
     output = Path.home() / "Library/Mobile Documents/com~apple~CloudDocs/Documents/knowledge_map_data.json"
-    save_data(data, output)
+    args.cache_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = get_manifest_path(args.cache_dir / output.name)
+
+    if args.watch:
+        watch(output, manifest_path, args.cache_dir, args.full, args.poll, args.workers,
+              args.cloud_workers, args.max_semantic_links, args.compact, args.gzip,
+              args.follow_symlinks)
+        sys.exit(0)
+
+    # Generate data, reusing unchanged directories from the last run
+    matchers = get_exclude_matchers(get_scan_locations())
+    rules = scan_rules_key(matchers, args.follow_symlinks)
+    previous_manifest = load_manifest(manifest_path, rules)
+    manifest = {} if args.full else previous_manifest
+    FILE_HASHES.update(load_file_hashes(args.cache_dir))
+    new_manifest = {}
+    counters = new_scan_counters()
+    start = time.perf_counter()
+    location_trees = scan_locations(get_scan_locations(), counters, manifest, new_manifest,
+                                    args.workers, args.cloud_workers, matchers, args.follow_symlinks)
+    moved, duplicates = compare_fingerprints(previous_manifest, new_manifest)
+    node_ids = NodeIds(args.cache_dir / NODE_IDS_NAME)
+    node_ids.carry_moves(moved)
+    data = graph_from_trees(location_trees, args.max_semantic_links, node_ids)
+    elapsed = time.perf_counter() - start
+    print(f"🔍 Scanned {counters['dirs']} directories in {elapsed:.1f}s "
+          f"({counters['reused_dirs']} reused from manifest, {counters['listed_dirs']} listed)")
+    if counters["moved_dirs"]:
+        print(f"📦 {counters['moved_dirs']} moved or renamed folders kept their cached records")
+    if counters["relinked_dirs"]:
+        print(f"🧷 {counters['relinked_dirs']} unchanged folders re-listed: their files gained "
+              f"hard links in other folders")
+    print(f"✂️  Pruned {counters['pruned_dirs']} excluded folders without opening them, "
+          f"skipped {counters['excluded_files']} excluded files")
+    if counters["nested_roots"]:
+        print(f"🔗 {counters['nested_roots']} nested locations reused an enclosing walk")
+    if counters["placeholders"]:
+        print(f"☁️  {counters['placeholders']} iCloud placeholders counted from their stubs "
+              f"({counters['placeholders']} downloads skipped)")
+    if counters["duplicate_links"] or counters["symlink_cycles"]:
+        print(f"🧷 {counters['duplicate_links']} extra hard links or symlinks counted once, "
+              f"{counters['symlink_cycles']} symlink loops skipped")
+    report_fingerprints(moved, duplicates)
+    
+    # Build locally, publish to iCloud Documents only when the graph changed
+    publish_data(data, output, args.cache_dir, compact=args.compact, gzip_sidecar=args.gzip)
+    node_ids.save()
+    save_manifest(new_manifest, manifest_path, previous_manifest, rules)
     
     print(f"Data saved to: {output}")
     print("Open knowledge_map_dynamic.html to view")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Symlinked iCloud Placeholder Test
+Checks that an evicted iCloud file reached through a folder symlink is
+counted once under --follow-symlinks all
+"""
+
+import os
+import sys
+import plistlib
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import knowledge_map_generator as generator
+
+STUB_SIZE = 123_456_789
+
+
+def write_stub(folder, name, size=STUB_SIZE):
+    """An evicted iCloud file: a .<name>.icloud plist holding its name and size"""
+    with open(folder / f".{name}.icloud", "wb") as f:
+        plistlib.dump({"NSURLNameKey": name, "NSURLFileSizeKey": size}, f)
+
+
+def scan(locations, workers):
+    counters = generator.new_scan_counters()
+    trees = generator.scan_locations(locations, counters, {}, {}, workers=workers, symlinks="all")
+    totals = {loc_id: (tree.files, tree.bytes) for loc_id, _, _, tree in trees}
+    return totals, counters
+
+
+def test_stub_behind_symlink_inside_a_location():
+    """The folder is also walked at its real path, so the link adds nothing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        docs, downloads = Path(tmp) / "Documents", Path(tmp) / "Downloads"
+        (docs / "Papers").mkdir(parents=True)
+        downloads.mkdir()
+        write_stub(docs / "Papers", "thesis.pdf")
+        (docs / "Papers" / "notes.txt").write_text("notes")
+        os.symlink(docs / "Papers", downloads / "Papers")
+        locations = [("docs", docs, "location"), ("downloads", downloads, "location")]
+
+        for workers in (1, 4):
+            totals, counters = scan(locations, workers)
+            assert totals["docs"] == (2, STUB_SIZE + 5), totals
+            assert totals["downloads"] == (0, 0), totals
+            assert counters["placeholders"] == 1, counters["placeholders"]
+
+
+def test_stub_behind_symlink_outside_the_locations():
+    """The folder is only reachable through the link, so the stub counts there once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        outside, downloads = Path(tmp) / "Elsewhere", Path(tmp) / "Downloads"
+        outside.mkdir()
+        downloads.mkdir()
+        write_stub(outside, "video.mov")
+        os.symlink(outside, downloads / "Linked")
+        os.symlink(outside, downloads / "Linked again")
+        locations = [("downloads", downloads, "location")]
+
+        for workers in (1, 4):
+            totals, counters = scan(locations, workers)
+            assert totals["downloads"] == (1, STUB_SIZE), totals
+            assert counters["placeholders"] == 1, counters["placeholders"]
+
+
+if __name__ == "__main__":
+    print("🧪 Running symlinked placeholder tests")
+    failed = 0
+    for name, test in list(globals().items()):
+        if not name.startswith("test_"):
+            continue
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"   ❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
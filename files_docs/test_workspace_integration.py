@@ -82,7 +82,12 @@ class IntegrationTester:
             has_methods = all(method in content for method in 
                             ["sort_incoming_files", "cleanup_old_files", "generate_workspace_report"])
             
-            if has_class and has_methods:
+            # sort_incoming_files imports the shared rules engine from its folder
+            has_rules = (self.project_workspaces / "category_rules.py").exists()
+            if not has_rules:
+                print("   ❌ category_rules.py not installed next to the automation script")
+            
+            if has_class and has_methods and has_rules:
                 print("   ✅ Automation script has required methods")
                 self.test_results.append(("Automation Scripts", True))
                 return True
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Category Rules Engine
+Compiled filename categorization shared by the organizers and workspace automation
+"""
+
+import sys
+import time
+import random
+import string
+import argparse
+from pathlib import Path
+
+
+def file_suffix(name):
+    """Lowercased extension of a file name, found the way Path.suffix finds it"""
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:].lower()
+    return ""
+
+
+class CategoryRules:
+    """Filename rules compiled once, applied with a fixed precedence
+
+    extension_rules and keyword_rules map a category to its extensions
+    (".pdf") or to substrings of the lowercased file name. An extension match
+    wins over a keyword match; within each kind the earlier category in the
+    dict wins, exactly like the first-match loops this replaces. Extensions
+    become one dict lookup. Keywords become a single table in precedence
+    order, without the keywords that can never decide a match.
+    """
+
+    def __init__(self, extension_rules=None, keyword_rules=None, default=None):
+        self.default = default
+        self.keyword_rules = {category: list(keywords)
+                              for category, keywords in (keyword_rules or {}).items()}
+
+        # extension -> categories in precedence order
+        self.by_extension = {}
+        for category, extensions in (extension_rules or {}).items():
+            for extension in extensions:
+                categories = self.by_extension.setdefault(extension, [])
+                if category not in categories:
+                    categories.append(category)
+
+        # A keyword that contains an earlier one (or repeats it) only ever
+        # matches after that one has, so it can be left out of the table
+        self.keyword_table = []
+        for category, keywords in self.keyword_rules.items():
+            for keyword in keywords:
+                if not any(earlier in keyword for earlier, _ in self.keyword_table):
+                    self.keyword_table.append((keyword, category))
+
+    def categorize(self, name):
+        """The winning category for a file name, or the default"""
+        if self.by_extension:
+            categories = self.by_extension.get(file_suffix(name))
+            if categories:
+                return categories[0]
+        if self.keyword_table:
+            name_lower = name.lower()
+            for keyword, category in self.keyword_table:
+                if keyword in name_lower:
+                    return category
+        return self.default
+
+    def explain(self, name):
+        """The winning category for a file name and the rule that decided it"""
+        if self.by_extension:
+            suffix = file_suffix(name)
+            categories = self.by_extension.get(suffix)
+            if categories:
+                return categories[0], f"extension {suffix}"
+        if self.keyword_table:
+            name_lower = name.lower()
+            for keyword, category in self.keyword_table:
+                if keyword in name_lower:
+                    return category, f"keyword {keyword}"
+        return self.default, "default"
+
+    def matches(self, name):
+        """Every matching category for a file name, best first"""
+        found = list(self.by_extension.get(file_suffix(name), ()))
+        name_lower = name.lower()
+        for category, keywords in self.keyword_rules.items():
+            if category not in found and any(keyword in name_lower for keyword in keywords):
+                found.append(category)
+        return found
+
+
+def legacy_extension_category(categories, file_path, default):
+    """The old DownloadsOrganizer.categorize_file loop, for comparison"""
+    file_ext = file_path.suffix.lower()
+    for category, extensions in categories.items():
+        if file_ext in extensions:
+            return category
+    return default
+
+
+def legacy_keyword_category(categories, file_path, default):
+    """The old DocumentsOrganizer.categorize_file keyword loops, for comparison"""
+    filename_lower = file_path.name.lower()
+    for category, keywords in categories.items():
+        for keyword in keywords:
+            if keyword in filename_lower:
+                return category
+    return default
+
+
+def sample_file_names(count, rules, seed=0):
+    """Synthetic file names mixing rule keywords, extensions and noise"""
+    rng = random.Random(seed)
+    words = sorted({word for values in rules for word in values if word and not word.startswith('.')})
+    extensions = sorted({ext for values in rules for ext in values if ext.startswith('.')})
+    extensions += [".pdf", ".docx", ".txt", ".jpg", ".zip", ".tar.gz", "", ".", ".PDF", ".Final"]
+    noise = ["report", "final", "IMG", "scan", "2024", "draft", "copy", "notes", "v2", "Meeting"]
+    names = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            roll = rng.random()
+            if roll < 0.25 and words:
+                word = rng.choice(words)
+                parts.append(word.upper() if rng.random() < 0.2 else word)
+            elif roll < 0.6:
+                parts.append(rng.choice(noise))
+            else:
+                parts.append("".join(rng.choices(string.ascii_letters, k=rng.randint(3, 8))))
+        prefix = "." if rng.random() < 0.02 else ""
+        names.append(prefix + rng.choice(["_", "-", " "]).join(parts) + rng.choice(extensions))
+    return names
+
+
+def run_benchmark(count=100000):
+    """Compare compiled rules against the old loops on the organizers' own categories"""
+    sys.path.insert(0, str(Path(__file__).parent))
+    from generic_downloads_organizer import DownloadsOrganizer
+    from generic_documents_organizer import DocumentsOrganizer
+
+    print(f"⏱️  Categorization benchmark ({count:,} file names)")
+    print("=" * 40)
+
+    cases = [
+        ("Downloads (extensions)", DownloadsOrganizer().categories, "Temporary",
+         legacy_extension_category, lambda rules: CategoryRules(extension_rules=rules, default="Temporary")),
+        ("Documents (keywords)", DocumentsOrganizer().categories, "To_Review",
+         legacy_keyword_category, lambda rules: CategoryRules(keyword_rules=rules, default="To_Review")),
+    ]
+    all_identical = True
+    for label, categories, default, legacy, compile_rules in cases:
+        names = sample_file_names(count, categories.values())
+        paths = [Path(name) for name in names]
+
+        start = time.perf_counter()
+        expected = [legacy(categories, path, default) for path in paths]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine = compile_rules(categories)
+        compile_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decided = [engine.categorize(path.name) for path in paths]
+        engine_time = time.perf_counter() - start
+
+        mismatches = sum(1 for a, b in zip(expected, decided) if a != b)
+        all_identical = all_identical and mismatches == 0
+        print(f"\n📂 {label}")
+        print(f"   old loops:       {legacy_time:8.3f}s  ({count / legacy_time:,.0f} names/s)")
+        print(f"   compiled rules:  {engine_time:8.3f}s  ({count / engine_time:,.0f} names/s), "
+              f"compiled in {compile_time * 1000:.2f}ms")
+        print(f"   Speedup: {legacy_time / engine_time:.2f}x")
+        print(f"   Decisions: {'✅ identical' if mismatches == 0 else f'❌ {mismatches} differ'}")
+    return all_identical
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiled filename categorization rules")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare compiled rules against the old loops")
+    parser.add_argument("--count", type=int, default=100000,
+                        help="file names to categorize in the benchmark (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if run_benchmark(args.count) else 1)
+    parser.print_help()
@@ -5,15 +5,31 @@ Organizes any user's Downloads folder into topic-based categories
 """
 
 import os
-import shutil
+import time
+import sys
+import argparse
 import platform
 from pathlib import Path
-from datetime import datetime
+from category_rules import CategoryRules
+from move_executor import DEFAULT_MOVE_WORKERS
+from organizer_base import FolderOrganizer
 
-class DownloadsOrganizer:
-    def __init__(self):
+# Watch mode: a file is finished once its size and mtime hold still this long
+WATCH_STABLE_SECONDS = 2.0
+WATCH_POLL_INTERVAL = 1.0
+# A burst (an archive unzipping) is moved once no new file has landed for
+# WATCH_STABLE_SECONDS, or every WATCH_MAX_BATCH_WAIT seconds while it lasts
+WATCH_MAX_BATCH_WAIT = 30.0
+# Browsers download into these (Chrome, Firefox, Safari) and rename when done
+PARTIAL_DOWNLOAD_SUFFIXES = (".crdownload", ".part", ".download")
+
+class DownloadsOrganizer(FolderOrganizer):
+    folder_name = "Downloads"
+    banner = "🗂️  Downloads Folder Organizer"
+
+    def __init__(self, full_audit=False, move_workers=DEFAULT_MOVE_WORKERS):
         self.downloads_path = self.get_downloads_path()
-        self.organized_path = self.downloads_path / "_ORGANIZED"
+        super().__init__(self.downloads_path, full_audit, move_workers)
         self.projects_path = self.organized_path / "Projects_By_Topic"
         
         # Generic categories - customize as needed
@@ -30,9 +46,7 @@ class DownloadsOrganizer:
             "Code": [".py", ".js", ".html", ".css", ".json"],
             "Temporary": []  # For manual review
         }
-        
-        self.moved_files = []
-        self.failed_files = []
+        self.rules = CategoryRules(extension_rules=self.categories, default="Temporary")
         
     def get_downloads_path(self):
         """Auto-detect Downloads folder for current user"""
@@ -46,184 +60,137 @@ class DownloadsOrganizer:
         else:  # Linux
             return home / "Downloads"
     
-    def count_files(self, directory):
-        """Count total files in directory and subdirectories"""
-        try:
-            return sum([len(files) for r, d, files in os.walk(directory)])
-        except:
-            return 0
-    
-    def create_folder_structure(self):
-        """Create organized folder structure"""
-        print(f"📁 Creating folder structure in {self.organized_path}")
-        
-        for category in self.categories.keys():
-            folder_path = self.organized_path / category
-            folder_path.mkdir(parents=True, exist_ok=True)
-            print(f"   Created: {category}")
-    
-    def categorize_file(self, file_path):
-        """Determine which category a file belongs to"""
-        file_ext = file_path.suffix.lower()
-        
-        for category, extensions in self.categories.items():
-            if file_ext in extensions:
-                return category
-        
-        return "Temporary"  # Uncategorized files for manual review
-    
-    def run_pre_audit(self):
-        """Count files before organization"""
-        self.original_count = self.count_files(self.downloads_path)
-        print(f"🔍 Pre-audit: Found {self.original_count} total files")
-        
-        # Count loose files in Downloads root
-        loose_files = [f for f in self.downloads_path.iterdir() 
-                      if f.is_file() and not f.name.startswith('.')]
-        print(f"📄 Files to organize: {len(loose_files)}")
-        return loose_files
-    
-    def test_move(self, files):
-        """Test moving 3 files first"""
-        test_files = files[:3] if len(files) >= 3 else files
-        print(f"🧪 Testing with {len(test_files)} files...")
-        
-        for file_path in test_files:
-            category = self.categorize_file(file_path)
-            dest_folder = self.organized_path / category
-            dest_path = dest_folder / file_path.name
-            
-            try:
-                shutil.move(str(file_path), str(dest_path))
-                self.moved_files.append(file_path.name)
-                print(f"   ✅ Test moved: {file_path.name} → {category}")
-            except Exception as e:
-                self.failed_files.append((file_path.name, str(e)))
-                print(f"   ❌ Test failed: {file_path.name} - {e}")
-        
-        if self.failed_files:
-            print("⚠️  Test failures detected. Check permissions/disk space.")
-            return False
-        return True
-    
-    def organize_files(self, files):
-        """Organize remaining files"""
-        remaining_files = files[3:] if len(files) >= 3 else []
-        
-        print(f"📦 Organizing {len(remaining_files)} remaining files...")
-        
-        for file_path in remaining_files:
-            category = self.categorize_file(file_path)
-            dest_folder = self.organized_path / category
-            dest_path = dest_folder / file_path.name
-            
-            try:
-                shutil.move(str(file_path), str(dest_path))
-                self.moved_files.append(file_path.name)
-                print(f"   ✅ Moved: {file_path.name} → {category}")
-            except Exception as e:
-                self.failed_files.append((file_path.name, str(e)))
-                print(f"   ❌ Failed: {file_path.name} - {e}")
-    
-    def run_post_audit(self):
-        """Verify organization completed successfully"""
-        final_count = self.count_files(self.downloads_path)
-        moved_count = len(self.moved_files)
-        failed_count = len(self.failed_files)
-
-        print(f"\n📊 Post-audit Results:")
-        print(f"   Original files: {self.original_count}")
-        print(f"   Final files: {final_count}")
-        print(f"   Successfully moved: {moved_count}")
-        print(f"   Failed to move: {failed_count}")
-
-        # BUG FIX: Improved integrity check logic
-        # After moving files INTO _ORGANIZED subdirectories, total file count should stay the same
-        # (count_files() uses os.walk which counts all subdirectories)
-        # But we also want to check that no files went missing
-        files_disappeared = final_count < self.original_count
-        expected_processed = moved_count + failed_count
-
-        # Check if files in organized folders match what we moved
-        organized_count = self.count_files(self.organized_path)
-
-        print(f"   Files in _ORGANIZED: {organized_count}")
-
-        # Integrity passes if:
-        # 1. No files disappeared (final >= original)
-        # 2. Files in organized folders >= files we claim to have moved
-        integrity_check = (not files_disappeared) and (organized_count >= moved_count)
-
-        print(f"   Integrity check: {'✅ PASSED' if integrity_check else '❌ FAILED'}")
-
-        if files_disappeared:
-            missing = self.original_count - final_count
-            print(f"   ⚠️ WARNING: {missing} files appear to be missing from the file system!")
-
-        if self.failed_files:
-            print(f"\n⚠️  Failed files:")
-            for file_name, error in self.failed_files:
-                print(f"   • {file_name}: {error}")
-    
-    def generate_report(self):
-        """Generate organization report"""
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        report_path = self.downloads_path / f"organization_report_{timestamp}.txt"
-        
-        with open(report_path, 'w') as f:
-            f.write(f"Downloads Organization Report - {timestamp}\n")
-            f.write("=" * 50 + "\n\n")
-            f.write(f"Downloads path: {self.downloads_path}\n")
-            f.write(f"Total files processed: {len(self.moved_files) + len(self.failed_files)}\n")
-            f.write(f"Successfully organized: {len(self.moved_files)}\n")
-            f.write(f"Failed to organize: {len(self.failed_files)}\n\n")
-            
-            if self.moved_files:
-                f.write("Successfully moved files:\n")
-                for file_name in self.moved_files:
-                    f.write(f"  • {file_name}\n")
-                f.write("\n")
-            
-            if self.failed_files:
-                f.write("Failed files:\n")
-                for file_name, error in self.failed_files:
-                    f.write(f"  • {file_name}: {error}\n")
-        
-        print(f"📄 Report saved: {report_path}")
+    def classify_file(self, file_path, st=None):
+        """Category for a file and the rule that decided it
+
+        Extension rules only need the name; st is accepted because
+        plan_moves passes every organizer the file's stat result.
+        """
+        return self.rules.explain(file_path.name)
     
-    def run(self):
-        """Main execution flow"""
+    def is_downloading(self, name, names):
+        """True for an unfinished download, or a file whose download is still running"""
+        if name.lower().endswith(PARTIAL_DOWNLOAD_SUFFIXES):
+            return True
+        return any(name + suffix in names for suffix in PARTIAL_DOWNLOAD_SUFFIXES)
+
+    def organize_batch(self, loose_files):
+        """Move one burst of finished downloads as a single journaled transaction"""
+        self.snapshot = {str(path): (st.st_size, st.st_dev, st.st_ino) for path, st in loose_files}
+        self.inventory = dict(self.snapshot)
+        self.journal = []
+        self.original_count = len(loose_files)
+        plan = self.plan_moves(loose_files)
+        moves = [(source, destination) for source, destination, rule, size in plan]
+
+        failed_before = len(self.failed_files)
+        try:
+            self.start_journal(moves)
+            self.organize_files(moves)
+            self.finish_journal("complete")
+        finally:
+            if self.move_journal:
+                self.move_journal.close()
+
+        failed = {name for name, error in self.failed_files[failed_before:]}
+        for source, destination, rule, size in plan:
+            if source.name not in failed:
+                category = destination.parent.relative_to(self.organized_path)
+                print(f"   ✅ {source.name} → {category} ({rule})")
+        for name, error in self.failed_files[failed_before:]:
+            print(f"   ❌ {name} - {error}")
+
+    def watch(self):
+        """Organize new downloads as they finish, until Ctrl+C; False if it can't start
+
+        Files already in Downloads are left for a normal run. A new file is
+        moved once its size has held still for WATCH_STABLE_SECONDS and no
+        .crdownload/.part/.download sibling says the browser is still on it.
+        """
         print("🗂️  Downloads Folder Organizer")
         print("=" * 40)
-        print(f"Working on: {self.downloads_path}")
-        
-        # Create folder structure
+        print(f"Watching: {self.downloads_path}")
+        if self.refuse_unfinished_journal():
+            return False
         self.create_folder_structure()
-        
-        # Pre-audit
-        files_to_organize = self.run_pre_audit()
-        
-        if not files_to_organize:
-            print("✨ No files to organize!")
-            return
-        
-        # Test with small batch
-        if not self.test_move(files_to_organize):
-            print("❌ Testing failed. Aborting.")
-            return
-        
-        # Organize remaining files
-        self.organize_files(files_to_organize)
-        
-        # Post-audit
-        self.run_post_audit()
-        
-        # Generate report
-        self.generate_report()
-        
-        print(f"\n🎉 Organization complete!")
-        print(f"📁 Organized files are in: {self.organized_path}")
+
+        root = str(self.downloads_path)
+        existing = {path for path, st in self.list_loose_files()[0]}
+        pending = {}           # path -> ((size, mtime), monotonic time it last changed)
+        last_arrival = None    # when a new file last appeared
+        burst_start = None     # when the oldest ready file became ready
+        root_mtime = None
+        print(f"👀 Leaving {len(existing)} existing files for a normal run, Ctrl+C to stop")
+
+        try:
+            while True:
+                time.sleep(WATCH_POLL_INTERVAL)
+                mtime = os.stat(root).st_mtime_ns
+                if mtime == root_mtime and not pending:
+                    continue
+                root_mtime = mtime
+
+                now = time.monotonic()
+                names = set(os.listdir(root))
+                loose_files, _ = self.list_loose_files()
+                current = {path for path, st in loose_files}
+                existing &= current
+                ready = []
+                for path, st in loose_files:
+                    if path in existing or self.is_downloading(path.name, names):
+                        continue
+                    signature = (st.st_size, st.st_mtime_ns)
+                    seen = pending.get(path)
+                    if seen is None:
+                        last_arrival = now
+                    if seen is None or seen[0] != signature:
+                        pending[path] = (signature, now)
+                    elif now - seen[1] >= WATCH_STABLE_SECONDS:
+                        ready.append((path, st))
+                pending = {path: seen for path, seen in pending.items() if path in current}
+
+                if not ready:
+                    burst_start = None
+                    continue
+                burst_start = burst_start or now
+                if now - last_arrival < WATCH_STABLE_SECONDS and now - burst_start < WATCH_MAX_BATCH_WAIT:
+                    continue  # more of the burst is still landing
+
+                print(f"\n📥 {len(ready)} new downloads finished")
+                self.organize_batch(ready)
+                for path, st in ready:
+                    pending.pop(path, None)
+                # A file that failed to move stays put; leave it for a normal run
+                existing |= {path for path, st in ready if path.exists()}
+                burst_start = None
+        except KeyboardInterrupt:
+            print(f"\n👋 Stopped watching: {len(self.moved_files)} files organized, "
+                  f"{len(self.failed_files)} failed")
+        return True
 
 if __name__ == "__main__":
-    organizer = DownloadsOrganizer()
-    organizer.run()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--full-audit", action="store_true",
+                        help="walk the folder again after moving and compare it with the inventory")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MOVE_WORKERS,
+                        help="files moved in parallel (default: %(default)s)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--resume", action="store_true",
+                      help="continue an interrupted run from its move journal")
+    mode.add_argument("--plan", metavar="PLAN_FILE",
+                      help="write every planned move to PLAN_FILE and change nothing")
+    mode.add_argument("--apply", metavar="PLAN_FILE",
+                      help="carry out the moves in a plan file written by --plan")
+    mode.add_argument("--watch", action="store_true",
+                      help="stay running and organize new downloads as soon as they finish")
+    args = parser.parse_args()
+
+    organizer = DownloadsOrganizer(full_audit=args.full_audit, move_workers=args.workers)
+    if args.plan:
+        organizer.write_plan(args.plan)
+    elif args.watch:
+        if not organizer.watch():
+            sys.exit(1)
+    else:
+        if not organizer.run(resume=args.resume, plan_path=args.apply):
+            sys.exit(1)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+iCloud Placeholders
+Recognizes evicted iCloud files, whose contents are not on this Mac, so that
+the organizers, the knowledge map and the duplicate finders never download
+them by reading or copying them
+"""
+
+import os
+import plistlib
+
+# Older macOS leaves a ".<name>.icloud" stub in place of an evicted file
+ICLOUD_STUB_SUFFIX = ".icloud"
+# Newer macOS keeps the file's name and size and marks it dataless instead
+SF_DATALESS = 0x40000000
+
+
+def is_icloud_placeholder(name):
+    """True for a ".<name>.icloud" stub left by an evicted iCloud file"""
+    return (name.startswith('.') and name.endswith(ICLOUD_STUB_SUFFIX)
+            and len(name) > len(ICLOUD_STUB_SUFFIX) + 1)
+
+
+def is_dataless(st):
+    """True for a stat result of an evicted file; reading it would download it"""
+    return bool(getattr(st, "st_flags", 0) & SF_DATALESS)
+
+
+def read_icloud_placeholder(path):
+    """Logical (name, size) of an evicted iCloud file, read from its stub
+
+    Only the small local stub is opened, so the file is not downloaded.
+    A stub that can't be parsed keeps the name from its file name and size 0.
+    """
+    stub = os.path.basename(path)
+    name, size = stub[1:-len(ICLOUD_STUB_SUFFIX)], 0
+    try:
+        with open(path, "rb") as f:
+            info = plistlib.load(f)
+        name = info.get("NSURLNameKey", name)
+        size = int(info.get("NSURLFileSizeKey", 0))
+    except (OSError, ValueError, TypeError, AttributeError):
+        pass
+    return name, size
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Downloads + Documents Organizer
+Organizes Downloads and Documents in one run: one inventory pass per folder,
+one move executor, one combined report
+"""
+
+import argparse
+from datetime import datetime
+from move_executor import MoveExecutor, DEFAULT_MOVE_WORKERS
+from generic_downloads_organizer import DownloadsOrganizer
+from generic_documents_organizer import DocumentsOrganizer
+
+
+class MultiRootOrganizer:
+    """Run several organizers as one pipeline
+
+    Each organizer keeps its own folder (root_path), category table, journal and audit;
+    only the moves are pooled, so one executor moves every file and each
+    result is booked by the organizer that planned it.
+    """
+
+    def __init__(self, organizers, move_workers=DEFAULT_MOVE_WORKERS):
+        self.organizers = organizers
+        self.move_workers = move_workers
+        self.owner = {}  # source path -> organizer that planned the move
+
+    def execute(self, moves_by_organizer):
+        """Move every organizer's files on one executor"""
+        moves = []
+        for organizer, organizer_moves in moves_by_organizer:
+            for source, destination in organizer_moves:
+                self.owner[str(source)] = organizer
+                moves.append((source, destination))
+
+        print(f"\n📦 Organizing {len(moves)} files across {len(moves_by_organizer)} folders "
+              f"({self.move_workers} workers)...")
+        executor = MoveExecutor(workers=self.move_workers)
+        for source, destination, error in executor.run(moves):
+            self.owner[str(source)].record_result(source, destination, error)
+
+        failed = sum(len(organizer.failed_files) for organizer in self.organizers)
+        if failed:
+            print(f"   ❌ {failed} files failed to move (listed in the post-audits)")
+
+    def generate_report(self):
+        """One report covering every folder, saved in Documents"""
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        report_root = self.organizers[-1].root_path
+        report_path = report_root / f"combined_organization_report_{timestamp}.txt"
+
+        with open(report_path, 'w') as f:
+            f.write(f"Combined Organization Report - {timestamp}\n")
+            f.write("=" * 50 + "\n\n")
+            f.write(f"Folders: {len(self.organizers)}\n")
+            f.write(f"Successfully organized: {sum(len(o.moved_files) for o in self.organizers)}\n")
+            f.write(f"Failed to organize: {sum(len(o.failed_files) for o in self.organizers)}\n\n")
+            for organizer in self.organizers:
+                f.write("-" * 50 + "\n")
+                organizer.write_report_body(f)
+                f.write("\n")
+
+        print(f"📄 Report saved: {report_path}")
+
+    def run(self, resume=False):
+        """Main execution flow"""
+        print("🗂️  Downloads + Documents Organizer")
+        print("=" * 40)
+        for organizer in self.organizers:
+            print(f"Working on: {organizer.root_path}")
+
+        moves_by_organizer = []
+        try:
+            for organizer in self.organizers:
+                print(f"\n📂 {organizer.root_path}")
+                if resume:
+                    remaining = organizer.load_journal()
+                    if remaining is None:
+                        continue
+                    print(f"⏯️  Resuming: {len(organizer.moved_files)} files already moved, "
+                          f"{len(remaining)} to go")
+                    moves_by_organizer.append((organizer, remaining))
+                    continue
+
+                if organizer.refuse_unfinished_journal():
+                    return
+                organizer.create_folder_structure()
+                plan = organizer.plan_moves(organizer.run_pre_audit())
+                if not plan:
+                    print("✨ No files to organize!")
+                    continue
+                if not organizer.test_move(plan):
+                    print("❌ Testing failed. Aborting.")
+                    return
+                moves = [(source, destination) for source, destination, rule, size in plan]
+                moves_by_organizer.append((organizer, moves))
+
+            if not moves_by_organizer:
+                print("\n✨ Nothing to organize in any folder!")
+                return
+
+            if not resume:
+                for organizer, moves in moves_by_organizer:
+                    organizer.start_journal(moves)
+            self.execute(moves_by_organizer)
+
+            for organizer, moves in moves_by_organizer:
+                print(f"\n📂 {organizer.root_path}")
+                organizer.run_post_audit()
+
+            self.generate_report()
+            for organizer, moves in moves_by_organizer:
+                organizer.finish_journal("complete")
+        finally:
+            # Interrupted: keep what was journaled so far for --resume
+            for organizer in self.organizers:
+                if organizer.move_journal:
+                    organizer.move_journal.close()
+
+        print(f"\n🎉 Organization complete!")
+        for organizer, moves in moves_by_organizer:
+            print(f"📁 Organized files are in: {organizer.organized_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--full-audit", action="store_true",
+                        help="walk each folder again after moving and compare it with the inventory")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MOVE_WORKERS,
+                        help="files moved in parallel (default: %(default)s)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run from each folder's move journal")
+    args = parser.parse_args()
+
+    organizers = [DownloadsOrganizer(full_audit=args.full_audit, move_workers=args.workers),
+                  DocumentsOrganizer(full_audit=args.full_audit, move_workers=args.workers)]
+    MultiRootOrganizer(organizers, move_workers=args.workers).run(resume=args.resume)
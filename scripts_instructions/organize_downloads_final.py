@@ -2,14 +2,17 @@
 """
 Downloads Organizer Script
 Run in Terminal: python3 /Users/jennifermckinney/Downloads/organize_downloads_final.py
+Preview without moving anything: add --dry-run
 """
 
-import os
+import re
+import time
 import shutil
+import argparse
+import fnmatch
 from pathlib import Path
 
 downloads = Path("/Users/jennifermckinney/Downloads")
-organized = downloads / "_ORGANIZED"
 
 # Create all folders
 folders = {
@@ -33,74 +36,111 @@ folders = {
     'Documents/Personal': ['*.rtf', '*.txt', '*.md'],
 }
 
-# Create folders
-for folder in folders.keys():
-    (organized / folder).mkdir(parents=True, exist_ok=True)
-print("✓ Created folder structure")
-
-# Move files
-moved = 0
-for file in downloads.iterdir():
-    if file.name == '_ORGANIZED' or file.name.startswith('.') or 'organize' in file.name.lower():
-        continue
-    
-    if file.is_file():
-        moved_flag = False
-        name_lower = file.name.lower()
-        
-        # Check each pattern
-        for folder, patterns in folders.items():
-            for pattern in patterns:
-                pattern_lower = pattern.lower().replace('*', '')
-                if pattern.startswith('*') and pattern.endswith('*'):
-                    if pattern_lower[1:-1] in name_lower:
-                        dest = organized / folder / file.name
-                        shutil.move(str(file), str(dest))
-                        print(f"→ {file.name} → {folder}")
-                        moved += 1
-                        moved_flag = True
-                        break
-                elif pattern.startswith('*'):
-                    if name_lower.endswith(pattern_lower[1:]):
-                        dest = organized / folder / file.name
-                        shutil.move(str(file), str(dest))
-                        print(f"→ {file.name} → {folder}")
-                        moved += 1
-                        moved_flag = True
-                        break
-                elif pattern.endswith('*'):
-                    if name_lower.startswith(pattern_lower[:-1]):
-                        dest = organized / folder / file.name
-                        shutil.move(str(file), str(dest))
-                        print(f"→ {file.name} → {folder}")
-                        moved += 1
-                        moved_flag = True
-                        break
-            if moved_flag:
-                break
-        
-        # If not moved by pattern, move by extension
-        if not moved_flag:
-            ext = file.suffix.lower()
-            if ext in ['.pdf']:
-                dest = organized / 'Documents/Reports' / file.name
-            elif ext in ['.docx', '.doc']:
-                dest = organized / 'Documents/Work_Documents' / file.name
-            else:
-                dest = organized / 'Documents/Personal' / file.name
-            
-            shutil.move(str(file), str(dest))
-            print(f"→ {file.name} → {dest.parent.name}")
-            moved += 1
-    
-    elif file.is_dir():
-        # Move directories to Archived_Projects
-        if file.name not in ['_ORGANIZED']:
-            dest = organized / 'Archived_Projects' / file.name
+
+def compile_folder_patterns(folders):
+    """Compile every folder's glob patterns into one case-insensitive regex
+
+    Each folder becomes a named group; the alternation keeps the table's
+    order, so the first folder with a matching pattern wins. Returns the
+    regex and a map from group name to folder.
+    """
+    group_folders = {}
+    alternatives = []
+    for index, (folder, patterns) in enumerate(folders.items()):
+        if not patterns:
+            continue
+        group = f"f{index}"
+        group_folders[group] = folder
+        globs = "|".join(fnmatch.translate(pattern.lower()) for pattern in patterns)
+        alternatives.append(f"(?P<{group}>{globs})")
+    return re.compile("|".join(alternatives) or "(?!)"), group_folders
+
+
+def classify(name, matcher, group_folders):
+    """Folder for a file name from the pattern table, or None"""
+    match = matcher.fullmatch(name.lower())
+    if match is None:
+        return None
+    return group_folders[match.lastgroup]
+
+
+def fallback_folder(file):
+    """Folder by extension for files no pattern matched"""
+    ext = file.suffix.lower()
+    if ext in ['.pdf']:
+        return 'Documents/Reports'
+    elif ext in ['.docx', '.doc']:
+        return 'Documents/Work_Documents'
+    return 'Documents/Personal'
+
+
+def organize(downloads, dry_run=False):
+    organized = downloads / "_ORGANIZED"
+    matcher, group_folders = compile_folder_patterns(folders)
+
+    # Create folders
+    if not dry_run:
+        for folder in folders.keys():
+            (organized / folder).mkdir(parents=True, exist_ok=True)
+        print("✓ Created folder structure")
+
+    # Move files
+    moved = 0
+    classified = 0
+    classify_time = 0.0
+    planned = {}
+    for file in downloads.iterdir():
+        if file.name == '_ORGANIZED' or file.name.startswith('.') or 'organize' in file.name.lower():
+            continue
+
+        if file.is_file():
+            start = time.perf_counter()
+            folder = classify(file.name, matcher, group_folders)
+            classify_time += time.perf_counter() - start
+            classified += 1
+
+            # If not moved by pattern, move by extension
+            shown = folder
+            if folder is None:
+                folder = fallback_folder(file)
+                shown = Path(folder).name
+            dest = organized / folder / file.name
+        elif file.is_dir():
+            # Move directories to Archived_Projects
+            folder = shown = 'Archived_Projects'
+            dest = organized / folder / file.name
+        else:
+            continue
+
+        planned[folder] = planned.get(folder, 0) + 1
+        if dry_run:
+            print(f"→ {file.name} → {shown} (dry run)")
+            continue
+        if file.is_dir():
             dest.parent.mkdir(exist_ok=True)
-            shutil.move(str(file), str(dest))
-            print(f"→ {file.name} → Archived_Projects")
-            moved += 1
+        shutil.move(str(file), str(dest))
+        print(f"→ {file.name} → {shown}")
+        moved += 1
+
+    if dry_run:
+        rate = classified / classify_time if classify_time else 0
+        print(f"\n🧪 Dry run: {sum(planned.values())} items would move, nothing was changed")
+        for folder, count in sorted(planned.items()):
+            print(f"   {folder}: {count}")
+        print(f"⏱️  Classified {classified} files in {classify_time * 1000:.2f}ms "
+              f"({rate:,.0f} files/s)")
+        return
+
+    print(f"\n✓ Organization complete! Moved {moved} items")
+    print(f"✓ Downloads folder now contains only _ORGANIZED and scripts")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sort Downloads into _ORGANIZED by name patterns")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="show where each item would go and the classification throughput")
+    parser.add_argument("--downloads", type=Path, default=downloads,
+                        help="folder to organize (default: %(default)s)")
+    args = parser.parse_args()
 
-print(f"\n✓ Organization complete! Moved {moved} items")
-print(f"✓ Downloads folder now contains only _ORGANIZED and scripts")
+    organize(args.downloads, args.dry_run)
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Folder Organizer Base
+Inventory, plan, journal, move and audit steps shared by the Downloads and
+Documents organizers; each organizer only names its folder and categories
+"""
+
+import os
+import shutil
+import time
+from pathlib import Path
+from datetime import datetime
+from move_executor import (MoveExecutor, MoveJournal, DEFAULT_MOVE_WORKERS,
+                           write_move_plan, read_move_plan, relative_path)
+from icloud_placeholders import is_icloud_placeholder, read_icloud_placeholder
+
+
+class FolderOrganizer:
+    """Organize the loose files of one folder into _ORGANIZED/<category>
+
+    A subclass sets self.categories and implements classify_file; the class
+    attributes below name the folder in the console and the report.
+    """
+
+    folder_name = "Folder"
+    banner = "🗂️  Folder Organizer"
+    report_prefix = "organization_report"
+    skipped_names = set()  # root entries never organized, besides dotfiles
+
+    def __init__(self, root_path, full_audit=False, move_workers=DEFAULT_MOVE_WORKERS):
+        self.root_path = root_path  # the folder being organized
+        self.organized_path = root_path / "_ORGANIZED"
+        self.categories = {}
+
+        self.moved_files = []
+        self.failed_files = []
+        self.deferred_placeholders = []  # (logical name, size) of evicted iCloud files
+
+        # One inventory walk per run; moves update it instead of re-walking
+        self.full_audit = full_audit     # also re-walk after moving, to cross-check the disk
+        self.snapshot = {}               # {path: (size, dev, inode)} before any move
+        self.inventory = {}              # snapshot with every completed move applied
+        self.journal = []                # (source, destination) of each completed move
+        self.move_workers = move_workers  # threads moving files in organize_files
+
+        # Crash-safe record of the run on disk, for --resume
+        self.journal_path = self.organized_path / ".organizer_journal.jsonl"
+        self.move_journal = None
+
+    def take_inventory(self, directory):
+        """Snapshot every file below directory as {path: (size, dev, inode)}
+
+        Folder symlinks are not followed, so link loops can't trap the walk.
+        Broken symlinks and files removed mid-walk are left out.
+        """
+        inventory = {}
+        journal_path = str(self.journal_path)
+        stack = [str(directory)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                if not entry.is_symlink():
+                                    stack.append(entry.path)
+                                continue
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        if entry.path == journal_path:
+                            continue
+                        inventory[entry.path] = (st.st_size, st.st_dev, st.st_ino)
+            except OSError:
+                continue
+        return inventory
+
+    def physical_count(self, inventory):
+        """Files in an inventory; hard links and symlinks to the same file count once"""
+        return len({(dev, inode) for size, dev, inode in inventory.values()})
+
+    def count_files(self, directory):
+        """Count physical files in directory and subdirectories"""
+        return self.physical_count(self.take_inventory(directory))
+
+    def record_move(self, source, destination, info=None):
+        """Apply one completed move to the inventory, as it would be re-walked
+
+        info is the destination's (size, dev, inode) when already known, as
+        when a journal is replayed. New moves are appended to the journal.
+        """
+        source, destination = str(source), str(destination)
+        self.journal.append((source, destination))
+        self.inventory.pop(source, None)
+        if info is None:
+            try:
+                st = os.stat(destination)
+                info = (st.st_size, st.st_dev, st.st_ino)
+            except OSError:
+                pass  # the post-audit reports it missing
+        if info is not None:
+            self.inventory[destination] = tuple(info)
+        if self.move_journal:
+            self.move_journal.append({"op": "moved", "src": source, "dst": destination,
+                                      "info": list(info) if info is not None else None})
+
+    def record_result(self, source, destination, error):
+        """Book one move reported by the move executor"""
+        if error is None:
+            self.record_move(source, destination)
+            self.moved_files.append(Path(source).name)
+        else:
+            self.record_failure(source, error)
+
+    def record_failure(self, source, error):
+        """Note a move that failed, in the report and the journal"""
+        self.failed_files.append((Path(source).name, str(error)))
+        if self.move_journal:
+            self.move_journal.append({"op": "failed", "src": str(source), "error": str(error)})
+
+    def journal_unfinished(self):
+        """True if the journal holds a run that was interrupted and not yet resumed"""
+        if not self.journal_path.exists():
+            return False
+        entries, length = MoveJournal.load(self.journal_path)
+        return bool(entries) and entries[-1].get("op") != "end"
+
+    def refuse_unfinished_journal(self):
+        """Print why a new run would not start over an interrupted one; True if it must not"""
+        if not self.journal_unfinished():
+            return False
+        print(f"❌ An interrupted run is recorded in {self.journal_path}")
+        print("   Finish it with --resume first, or delete the journal to start over")
+        return True
+
+    def start_journal(self, moves):
+        """Begin the run's journal with its root, its counts and the plan"""
+        self.move_journal = MoveJournal(self.journal_path)
+        self.move_journal.start({
+            "op": "begin",
+            "root": str(self.root_path),
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "original_count": self.original_count,
+            "planned": len(moves),
+            "deferred": len(self.deferred_placeholders),
+        })
+        self.move_journal.append({"op": "plan",
+                                  "moves": [[str(source), str(dest)] for source, dest in moves]})
+        self.move_journal.sync()
+
+    def finish_journal(self, status):
+        """Mark the run finished so it is not resumed, and close the journal"""
+        if self.move_journal:
+            self.move_journal.append({"op": "end", "status": status})
+            self.move_journal.close()
+            self.move_journal = None
+
+    def plan_moves(self, loose_files):
+        """Categorize each file once: (source, destination, rule, size) per file"""
+        plan = []
+        for file_path, st in loose_files:
+            category, rule = self.classify_file(file_path, st)
+            plan.append((file_path, self.organized_path / category / file_path.name, rule, st.st_size))
+        return plan
+
+    def write_plan(self, plan_path):
+        """Plan every move into a plan file, without touching the folder"""
+        plan_path = Path(plan_path).resolve()
+        start = time.perf_counter()
+        # Leave out the plan file itself if it is written into the folder
+        plan_in_root = plan_path.parent == self.root_path.resolve()
+        loose_files = [(path, st) for path, st in self.list_loose_files()[0]
+                       if not (plan_in_root and path.name == plan_path.name)]
+        plan = self.plan_moves(loose_files)
+        write_move_plan(plan_path, self.root_path, self.organized_path, plan)
+        elapsed = time.perf_counter() - start
+
+        totals = {}
+        for source, destination, rule, size in plan:
+            category = os.path.dirname(relative_path(destination, str(self.organized_path)))
+            count, size_sum = totals.get(category, (0, 0))
+            totals[category] = (count + 1, size_sum + size)
+        print(f"🗺️  Planned {len(plan)} moves in {elapsed:.2f}s → {plan_path}")
+        for category, (count, size_sum) in sorted(totals.items()):
+            print(f"   {category}: {count} files, {size_sum / 1e6:,.1f} MB")
+        print(f"Apply it with --apply {plan_path}")
+
+    def load_plan(self, plan_path):
+        """Planned moves from a plan file, minus files gone since it was written
+
+        Raises ValueError for a plan made for another folder, or one that
+        would move a file outside _ORGANIZED.
+        """
+        root, organized, plan = read_move_plan(plan_path)
+        if root != self.root_path or organized != self.organized_path:
+            raise ValueError(f"{plan_path} was planned for {root}, not {self.root_path}")
+        organized_real = self.organized_path.resolve()
+        for source, destination, rule, size in plan:
+            if not destination.resolve().parent.is_relative_to(organized_real):
+                raise ValueError(f"{plan_path} moves {source.name} outside {self.organized_path}")
+        current = [entry for entry in plan if str(entry[0]) in self.snapshot]
+        if len(current) < len(plan):
+            print(f"⏭️  Skipping {len(plan) - len(current)} planned files that are no longer there")
+        return current
+
+    def load_journal(self):
+        """Restore an interrupted run from its journal
+
+        Takes the inventory as the interrupted run left the folder, replays
+        the journaled moves into the moved files and returns the planned
+        moves still to do, or None if there is nothing to resume. A move
+        missing from the journal because the run died before its entry was
+        synced is found done on disk and recorded. Moves that failed are
+        tried again.
+        """
+        if not self.journal_path.exists():
+            print("✨ No interrupted run to resume")
+            return None
+        entries, length = MoveJournal.load(self.journal_path)
+        if not entries or entries[0].get("op") != "begin" or entries[0].get("root") != str(self.root_path):
+            print(f"❌ {self.journal_path} is not a journal for this folder")
+            return None
+        if entries[-1].get("op") == "end":
+            print("✨ The last run finished; nothing to resume")
+            return None
+
+        # The header only holds counts; the folder itself is walked once
+        self.original_count = entries[0]["original_count"]
+        self.inventory = self.take_inventory(self.root_path)
+        self.deferred_placeholders = [read_icloud_placeholder(f) for f in self.list_loose_files()[1]]
+
+        planned = []
+        done = {}  # source -> (size, dev, inode) journaled for its move
+        for entry in entries[1:]:
+            if entry["op"] == "plan":
+                planned.extend(entry["moves"])
+            elif entry["op"] == "moved":
+                self.journal.append((entry["src"], entry["dst"]))
+                self.moved_files.append(Path(entry["src"]).name)
+                done[entry["src"]] = entry["info"]
+
+        self.move_journal = MoveJournal(self.journal_path)
+        self.move_journal.reopen(length)
+        remaining = []
+        for source, destination in planned:
+            if source in done:
+                continue
+            if not os.path.lexists(source) and os.path.lexists(destination):
+                self.record_move(source, destination)
+                self.moved_files.append(Path(source).name)
+            else:
+                remaining.append((Path(source), Path(destination)))
+
+        # Before the run, every moved file was still at its source
+        self.snapshot = dict(self.inventory)
+        for source, destination in self.journal:
+            info = self.snapshot.pop(destination, None) or done.get(source)
+            if info is not None:
+                self.snapshot[source] = tuple(info)
+        return remaining
+    
+    def create_folder_structure(self):
+        """Create organized folder structure"""
+        print(f"📁 Creating folder structure in {self.organized_path}")
+        
+        for category in self.categories.keys():
+            folder_path = self.organized_path / category
+            folder_path.mkdir(parents=True, exist_ok=True)
+            print(f"   Created: {category}")
+    
+    def categorize_file(self, file_path):
+        """Determine which category a file belongs to"""
+        return self.classify_file(file_path)[0]
+    
+    def classify_file(self, file_path, st=None):
+        """Category for a file and the rule that decided it; st saves a stat call"""
+        raise NotImplementedError
+    
+    def list_loose_files(self):
+        """Loose files in the root folder with their stat results, and its iCloud stubs
+
+        One listing returns both: (loose_files, placeholders), where
+        placeholders are the paths of ".<name>.icloud" stubs.
+        """
+        loose_files = []
+        placeholders = []
+        with os.scandir(self.root_path) as it:
+            for entry in it:
+                try:
+                    if entry.name.startswith('.'):
+                        if is_icloud_placeholder(entry.name) and entry.is_file():
+                            placeholders.append(Path(entry.path))
+                        continue
+                    if entry.name in self.skipped_names:
+                        continue
+                    if entry.is_file():
+                        loose_files.append((Path(entry.path), entry.stat()))
+                except OSError:
+                    continue
+        return loose_files, placeholders
+    
+    def run_pre_audit(self):
+        """Count files before organization"""
+        self.snapshot = self.take_inventory(self.root_path)
+        self.inventory = dict(self.snapshot)
+        self.original_count = self.physical_count(self.snapshot)
+        print(f"🔍 Pre-audit: Found {self.original_count} total files")
+        
+        # Count loose files in the root folder
+        loose_files, placeholders = self.list_loose_files()
+        print(f"📄 Files to organize: {len(loose_files)}")
+
+        # Evicted iCloud files are left in place; moving one would download it first
+        self.deferred_placeholders = [read_icloud_placeholder(f) for f in placeholders]
+        if self.deferred_placeholders:
+            print(f"☁️  Deferred {len(self.deferred_placeholders)} iCloud placeholders "
+                  f"(not downloaded, download them in Finder to organize)")
+        return loose_files
+    
+    def check_move(self, source, destination):
+        """Why a planned move would fail, or None; nothing is moved"""
+        try:
+            os.lstat(source)
+        except OSError as e:
+            return str(e)
+        if not os.access(source, os.R_OK):
+            return "source is not readable"
+        if not os.access(os.path.dirname(source), os.W_OK):
+            return "source folder is not writable"
+        if not os.path.isdir(os.path.dirname(destination)):
+            return "destination folder does not exist"
+        if not os.access(os.path.dirname(destination), os.W_OK):
+            return "destination folder is not writable"
+        return None
+
+    def test_move(self, plan):
+        """Check the first 3 planned moves, and room for the plan, without moving anything"""
+        test_moves = plan[:3]
+        print(f"🧪 Testing with {len(test_moves)} files...")
+        
+        problems = []
+        for file_path, dest_path, rule, size in test_moves:
+            category = dest_path.parent.relative_to(self.organized_path)
+            problem = self.check_move(file_path, dest_path)
+            if problem is None:
+                print(f"   ✅ Test passed: {file_path.name} → {category} ({rule})")
+            else:
+                problems.append(problem)
+                print(f"   ❌ Test failed: {file_path.name} - {problem}")
+        
+        # Files moved to another device need room there; renames don't
+        dest_device = os.stat(self.organized_path).st_dev
+        copied_bytes = sum(size for source, dest, rule, size in plan
+                           if self.inventory.get(str(source), (0, dest_device))[1] != dest_device)
+        free_bytes = shutil.disk_usage(self.organized_path).free
+        if copied_bytes > free_bytes:
+            problems.append("not enough space")
+            print(f"   ❌ {copied_bytes / 1e6:,.0f} MB to copy to another device, "
+                  f"only {free_bytes / 1e6:,.0f} MB free")
+        
+        if problems:
+            print("⚠️  Test failures detected. Check permissions/disk space.")
+            return False
+        return True
+    
+    def organize_files(self, moves):
+        """Run planned moves on the move executor"""
+        print(f"📦 Organizing {len(moves)} files "
+              f"({self.move_workers} workers)...")
+        
+        # Moves finish out of order; bookkeeping happens here, on one thread
+        executor = MoveExecutor(workers=self.move_workers)
+        for file_path, dest_path, error in executor.run(moves):
+            self.record_result(file_path, dest_path, error)
+        
+        if self.failed_files:
+            print(f"   ❌ {len(self.failed_files)} files failed to move (listed in the post-audit)")
+    
+    def run_post_audit(self):
+        """Verify organization completed successfully
+
+        Checks the inventory taken in the pre-audit, updated by each recorded
+        move, instead of walking the folder again.
+        """
+        final_count = self.physical_count(self.inventory)
+        moved_count = len(self.moved_files)
+        failed_count = len(self.failed_files)
+
+        print(f"\n📊 Post-audit Results:")
+        print(f"   Original files: {self.original_count}")
+        print(f"   Final files: {final_count}")
+        print(f"   Successfully moved: {moved_count}")
+        print(f"   Failed to move: {failed_count}")
+
+        # Every file from the snapshot must still be there with its size,
+        # at its destination if it was moved
+        moved_to = dict(self.journal)
+        expected = [(moved_to.get(path, path), size)
+                    for path, (size, dev, inode) in self.snapshot.items()]
+        missing = [path for path, size in expected
+                   if path not in self.inventory or self.inventory[path][0] != size]
+        # A move onto an existing file replaces it: two files expected at one path
+        overwritten = len(expected) - len({path for path, size in expected})
+
+        organized_prefix = str(self.organized_path) + os.sep
+        organized_count = self.physical_count(
+            {path: info for path, info in self.inventory.items() if path.startswith(organized_prefix)})
+
+        print(f"   Files in _ORGANIZED: {organized_count}")
+
+        # Integrity passes if:
+        # 1. Every file is where the journal says, with its original size
+        # 2. No move replaced another file
+        # 3. Files in organized folders >= files we claim to have moved
+        integrity_check = not missing and not overwritten and organized_count >= moved_count
+
+        if self.full_audit:
+            # Optional second walk: anything different was changed by another program
+            on_disk = self.take_inventory(self.root_path)
+            changed = set(on_disk.items()) ^ set(self.inventory.items())
+            changed_paths = {path for path, info in changed}
+            print(f"   Full audit: {len(changed_paths)} paths differ on disk")
+            for path in sorted(changed_paths)[:10]:
+                print(f"   • {path}")
+
+        print(f"   Integrity check: {'✅ PASSED' if integrity_check else '❌ FAILED'}")
+
+        if missing:
+            print(f"   ⚠️ WARNING: {len(missing)} files appear to be missing from the file system!")
+            for path in missing[:10]:
+                print(f"   • {path}")
+        if overwritten:
+            print(f"   ⚠️ WARNING: {overwritten} files were replaced by a moved file with the same name!")
+
+        if self.failed_files:
+            print(f"\n⚠️  Failed files:")
+            for file_name, error in self.failed_files:
+                print(f"   • {file_name}: {error}")
+    
+    def generate_report(self):
+        """Generate organization report"""
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        report_path = self.root_path / f"{self.report_prefix}_{timestamp}.txt"
+        
+        with open(report_path, 'w') as f:
+            f.write(f"{self.folder_name} Organization Report - {timestamp}\n")
+            f.write("=" * 50 + "\n\n")
+            self.write_report_body(f)
+        
+        print(f"📄 Report saved: {report_path}")
+    
+    def write_report_body(self, f):
+        """Write this run's results to an open report file"""
+        f.write(f"{self.folder_name} path: {self.root_path}\n")
+        f.write(f"Total files processed: {len(self.moved_files) + len(self.failed_files)}\n")
+        f.write(f"Successfully organized: {len(self.moved_files)}\n")
+        f.write(f"Failed to organize: {len(self.failed_files)}\n")
+        f.write(f"Deferred iCloud placeholders: {len(self.deferred_placeholders)}\n\n")
+        
+        if self.moved_files:
+            f.write("Successfully moved files:\n")
+            for file_name in self.moved_files:
+                f.write(f"  • {file_name}\n")
+            f.write("\n")
+        
+        if self.failed_files:
+            f.write("Failed files:\n")
+            for file_name, error in self.failed_files:
+                f.write(f"  • {file_name}: {error}\n")
+            f.write("\n")
+
+        if self.deferred_placeholders:
+            f.write("Deferred iCloud placeholders (not downloaded):\n")
+            for file_name, size in self.deferred_placeholders:
+                f.write(f"  • {file_name} ({size} bytes)\n")
+    
+    def run(self, resume=False, plan_path=None):
+        """Main execution flow; returns False if the run was aborted on an error"""
+        print(self.banner)
+        print("=" * 40)
+        print(f"Working on: {self.root_path}")
+        
+        try:
+            if resume:
+                # Pick up after the last journaled move, without re-sorting
+                remaining = self.load_journal()
+                if remaining is None:
+                    return True
+                print(f"⏯️  Resuming: {len(self.moved_files)} files already moved, {len(remaining)} to go")
+                self.organize_files(remaining)
+            else:
+                if self.refuse_unfinished_journal():
+                    return False
+                
+                # Create folder structure
+                self.create_folder_structure()
+                
+                # Pre-audit
+                files_to_organize = self.run_pre_audit()
+                
+                # Plan: categorize now, or take a plan file as it is
+                if plan_path:
+                    try:
+                        plan = self.load_plan(plan_path)
+                    except (OSError, ValueError, KeyError, TypeError) as e:
+                        print(f"❌ Error: could not load {plan_path}: {e}")
+                        return False
+                else:
+                    plan = self.plan_moves(files_to_organize)
+                if not plan:
+                    print("✨ No files to organize!")
+                    return True
+                
+                # Test with small batch
+                if not self.test_move(plan):
+                    print("❌ Testing failed. Aborting.")
+                    return False
+                
+                moves = [(source, destination) for source, destination, rule, size in plan]
+                self.start_journal(moves)
+                
+                # Organize files
+                self.organize_files(moves)
+            
+            # Post-audit
+            self.run_post_audit()
+            
+            # Generate report
+            self.generate_report()
+            self.finish_journal("complete")
+        finally:
+            # Interrupted: keep what was journaled so far for --resume
+            if self.move_journal:
+                self.move_journal.close()
+        
+        print(f"\n🎉 Organization complete!")
+        print(f"📁 Organized files are in: {self.organized_path}")
+        return True
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Reorganization Map
+Moves Archived_Projects entries into topic folders from a JSON map,
+checked against one listing of the folder and applied as plain renames
+"""
+
+import os
+import json
+import time
+import fnmatch
+import unicodedata
+from pathlib import Path
+from move_executor import move_file
+
+MAP_VERSION = 1
+DEFAULT_MAP_PATH = Path(__file__).with_name("project_topics.json")
+# Entries with any of these characters are glob patterns, matched after plain names
+GLOB_CHARS = set("*?[")
+IGNORED_NAMES = {".DS_Store"}
+
+
+def normalize(name):
+    """Compare names in NFC; macOS often stores them decomposed (NFD)"""
+    return unicodedata.normalize("NFC", name)
+
+
+def load_reorganization_map(path=DEFAULT_MAP_PATH):
+    """Read and check a map: its source folder, destination folder and topics
+
+    Topics map a folder below the destination to the entries of the source
+    folder that go there. Relative folders are taken from the map's own
+    directory, and ~ is expanded. Raises ValueError for a malformed map.
+    """
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get("version") != MAP_VERSION:
+        raise ValueError(f"unsupported reorganization map version: {data.get('version')}")
+
+    for key in ("source", "destination"):
+        if not isinstance(data.get(key), str):
+            raise ValueError(f"the map needs a \"{key}\" folder")
+    topics = data.get("topics")
+    if not isinstance(topics, dict):
+        raise ValueError("the map needs a \"topics\" object")
+    for topic, items in topics.items():
+        parts = Path(topic).parts
+        if not parts or Path(topic).is_absolute() or ".." in parts:
+            raise ValueError(f"topic must be a relative folder: {topic!r}")
+        if not isinstance(items, list) or not all(isinstance(item, str) and item for item in items):
+            raise ValueError(f"topic {topic!r} needs a list of names")
+        for item in items:
+            if "/" in item or item in (".", ".."):
+                raise ValueError(f"{item!r} in {topic!r} is not a single entry name")
+
+    base = path.parent
+    return {
+        "source": base / Path(data["source"]).expanduser(),
+        "destination": base / Path(data["destination"]).expanduser(),
+        "topics": topics,
+    }
+
+
+def _listing(folder):
+    """{NFC name: name on disk} for one folder, empty if it does not exist"""
+    try:
+        return {normalize(name): name for name in os.listdir(folder)}
+    except FileNotFoundError:
+        return {}
+
+
+def plan_reorganization(reorg_map):
+    """Match the map against one listing of the source folder
+
+    Returns (moves, missing, conflicts, mapped_twice, unmapped, in_place):
+    moves are (source, destination, topic), missing are (topic, name) for
+    plain names that are in neither the folder nor their topic folder,
+    conflicts are (topic, name, reason) for entries whose destination
+    already exists, mapped_twice are (topic, name, first_topic) for names
+    that an earlier topic of the map already claims (the first topic wins),
+    unmapped are the names no topic claims and in_place counts the names an
+    earlier run already moved.
+    """
+    source = reorg_map["source"]
+    destination = reorg_map["destination"]
+    present = _listing(source)
+    existing = {}  # topic -> listing of its folder, read once per topic
+
+    def in_topic(topic, key):
+        if topic not in existing:
+            existing[topic] = _listing(destination / topic)
+        return key in existing[topic]
+
+    claimed = {}  # NFC name -> topic
+    first_topic = {}  # NFC name -> first topic naming it, present or not
+    missing = []
+    conflicts = []
+    mapped_twice = []
+    in_place = 0
+    for topic, items in reorg_map["topics"].items():
+        for item in items:
+            if GLOB_CHARS & set(item):
+                continue
+            key = normalize(item)
+            if key in first_topic:
+                mapped_twice.append((topic, item, first_topic[key]))
+                continue
+            first_topic[key] = topic
+            if key not in present:
+                if in_topic(topic, key):
+                    in_place += 1
+                else:
+                    missing.append((topic, item))
+            else:
+                claimed[key] = topic
+
+    # Patterns only take what no plain name claimed, first topic wins
+    for topic, items in reorg_map["topics"].items():
+        for item in items:
+            if not GLOB_CHARS & set(item):
+                continue
+            pattern = normalize(item).lower()
+            for key in present:
+                if key not in claimed and key not in IGNORED_NAMES and fnmatch.fnmatchcase(key.lower(), pattern):
+                    claimed[key] = topic
+
+    moves = []
+    for key, topic in claimed.items():
+        if in_topic(topic, key):
+            conflicts.append((topic, present[key], "already in the topic folder"))
+            continue
+        moves.append((source / present[key], destination / topic / present[key], topic))
+
+    unmapped = sorted(name for key, name in present.items()
+                      if key not in claimed and name not in IGNORED_NAMES)
+    return moves, missing, conflicts, mapped_twice, unmapped, in_place
+
+
+def apply_reorganization(moves):
+    """Create the topic folders and move every entry; returns (moved, failed)
+
+    Source and destination normally share a device, so each entry, folder
+    or file, is a single rename however big it is. move_file falls back to
+    a copy when they do not.
+    """
+    devices = {}
+    for topic_dir in {destination.parent for _, destination, _ in moves}:
+        topic_dir.mkdir(parents=True, exist_ok=True)
+        devices[topic_dir] = os.stat(topic_dir).st_dev
+
+    moved = []
+    failed = []
+    for source, destination, topic in moves:
+        try:
+            if os.path.lexists(destination):
+                raise FileExistsError(f"{destination} appeared during the run")
+            move_file(source, destination, devices[destination.parent])
+        except OSError as e:
+            failed.append((source, e))
+        else:
+            moved.append((source, destination, topic))
+    return moved, failed
+
+
+def report_reorganization(moved, missing, conflicts, mapped_twice, failed, unmapped, in_place,
+                          elapsed, dry_run=False):
+    verb = "Would move" if dry_run else "Moved"
+    print(f"\n📦 {verb} {len(moved)} items in {elapsed * 1000:.1f}ms"
+          + (f", {in_place} already in their topic folder" if in_place else ""))
+    by_topic = {}
+    for source, destination, topic in moved:
+        by_topic.setdefault(topic, []).append(source.name)
+    for topic, names in by_topic.items():
+        print(f"   📁 {topic}: {len(names)} ({', '.join(names[:3])}{', ...' if len(names) > 3 else ''})")
+    if missing:
+        print(f"⚠️  {len(missing)} mapped items not found in the source folder:")
+        for topic, name in missing:
+            print(f"   • {name} ({topic})")
+    if mapped_twice:
+        moved_to = {normalize(source.name): topic for source, destination, topic in moved}
+        print(f"🔁 {len(mapped_twice)} items mapped to more than one topic, the first one wins:")
+        for topic, name, first in mapped_twice:
+            if moved_to.get(normalize(name)) == first:
+                outcome = f"{'would move' if dry_run else 'moved'} to {first}"
+            else:
+                outcome = f"not moved, see {first} above"
+            print(f"   • {name}: mapped twice, {outcome} (also mapped to {topic})")
+    if conflicts:
+        print(f"⛔ {len(conflicts)} conflicts left in place:")
+        for topic, name, reason in conflicts:
+            print(f"   • {name} → {topic}: {reason}")
+    if failed:
+        print(f"❌ {len(failed)} items failed to move:")
+        for source, error in failed:
+            print(f"   • {source.name}: {error}")
+    if unmapped:
+        print(f"📋 {len(unmapped)} items not in the map stay for manual review:")
+        for name in unmapped:
+            print(f"   • {name}")
+
+
+def reorganize(reorg_map, dry_run=False):
+    """Plan and apply a loaded reorganization map; returns the moved items"""
+    if not reorg_map["source"].is_dir():
+        print(f"❌ Error: {reorg_map['source']} does not exist")
+        return None
+
+    print(f"🗂️  Reorganizing {reorg_map['source']} into {reorg_map['destination']}")
+    start = time.perf_counter()
+    moves, missing, conflicts, mapped_twice, unmapped, in_place = plan_reorganization(reorg_map)
+    if dry_run:
+        moved, failed = moves, []
+    else:
+        moved, failed = apply_reorganization(moves)
+    elapsed = time.perf_counter() - start
+    report_reorganization(moved, missing, conflicts, mapped_twice, failed, unmapped, in_place,
+                          elapsed, dry_run)
+    return moved
+
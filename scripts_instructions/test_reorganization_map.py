@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Reorganization Map Test
+Checks where mapped entries end up and what the summary says about them
+"""
+
+import io
+import sys
+import json
+import tempfile
+from pathlib import Path
+from contextlib import redirect_stdout
+
+sys.path.insert(0, str(Path(__file__).parent))
+from reorganization_map import load_reorganization_map, reorganize
+
+
+def run_map(root, topics, dry_run=False):
+    """Write a map for root/Archived_Projects, apply it and return the summary"""
+    map_path = root / "map.json"
+    map_path.write_text(json.dumps({"version": 1, "source": "Archived_Projects",
+                                    "destination": "Projects_By_Topic", "topics": topics}))
+    output = io.StringIO()
+    with redirect_stdout(output):
+        reorganize(load_reorganization_map(map_path), dry_run)
+    return output.getvalue()
+
+
+def test_entry_mapped_twice_moves_to_first_topic():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        source = root / "Archived_Projects"
+        (source / "item5").mkdir(parents=True)
+        (source / "item6").mkdir()
+        topics = {"T1/sub": ["item5"], "T5/sub": ["item5", "item6"]}
+
+        report = run_map(root, topics, dry_run=True)
+        assert "mapped twice, would move to T1/sub (also mapped to T5/sub)" in report, report
+        assert (source / "item5").is_dir()
+
+        report = run_map(root, topics)
+        assert (root / "Projects_By_Topic/T1/sub/item5").is_dir()
+        assert not (root / "Projects_By_Topic/T5/sub/item5").exists()
+        assert not (source / "item5").exists()
+        assert (root / "Projects_By_Topic/T5/sub/item6").is_dir()
+        assert "item5: mapped twice, moved to T1/sub (also mapped to T5/sub)" in report, report
+        assert "conflicts" not in report, report
+
+        # A rerun finds item5 already in place and still names the first topic
+        report = run_map(root, topics)
+        assert "2 already in their topic folder" in report, report
+        assert "item5: mapped twice, not moved, see T1/sub above" in report, report
+        assert "not found" not in report, report
+
+
+def test_existing_destination_is_a_conflict():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "Archived_Projects/item1").mkdir(parents=True)
+        (root / "Projects_By_Topic/T1/item1").mkdir(parents=True)
+
+        report = run_map(root, {"T1": ["item1"]})
+        assert (root / "Archived_Projects/item1").is_dir()
+        assert "1 conflicts left in place" in report, report
+        assert "item1 → T1: already in the topic folder" in report, report
+
+
+if __name__ == "__main__":
+    print("🧪 Running reorganization map tests")
+    failed = 0
+    for name, test in list(globals().items()):
+        if not name.startswith("test_"):
+            continue
+        try:
+            test()
+            print(f"   ✅ {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"   ❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Zip Redundancy Check
+Finds .zip archives that are just copies of the extracted folder next to them,
+reading only each archive's central directory and never extracting anything
+"""
+
+import os
+import sys
+import zlib
+import zipfile
+import argparse
+import unicodedata
+from pathlib import Path
+from icloud_placeholders import is_dataless
+
+# Entries Archive Utility adds to zips that never appear in the extracted folder
+JUNK_PREFIXES = ("__MACOSX/",)
+JUNK_NAMES = {".DS_Store"}
+CRC_CHUNK = 1024 * 1024
+
+
+def normalize(name):
+    """Compare names in NFC; macOS often stores them decomposed (NFD)"""
+    return unicodedata.normalize("NFC", name)
+
+
+def zip_manifest(zip_path):
+    """{relative path: (size, crc32)} for the files listed in a zip's central directory"""
+    manifest = {}
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith(JUNK_PREFIXES) or name.rsplit("/", 1)[-1] in JUNK_NAMES:
+                continue
+            manifest[normalize(name)] = (info.file_size, info.CRC)
+    return manifest
+
+
+def strip_top_folder(manifest, folder_name):
+    """Drop a single top-level folder that extraction turned into the sibling folder itself"""
+    prefix = normalize(folder_name) + "/"
+    if manifest and all(name.startswith(prefix) for name in manifest):
+        return {name[len(prefix):]: entry for name, entry in manifest.items()}
+    return manifest
+
+
+def file_crc32(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CRC_CHUNK)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def compare_archive(zip_path, folder, stats):
+    """Entries of zip_path that the folder lacks or holds with other contents
+
+    Returns (manifest, different, unknown). CRC32 is computed only for
+    folder files whose size matches the entry, so a folder that differs is
+    usually told apart by sizes alone. Evicted iCloud files are never read,
+    since that would download them; their entries are unknown.
+    """
+    manifest = strip_top_folder(zip_manifest(zip_path), folder.name)
+    different = []
+    unknown = []
+    for name, (size, crc) in manifest.items():
+        path = os.path.join(folder, *name.split("/"))
+        try:
+            st = os.stat(path)
+        except OSError:
+            # The folder may spell the name decomposed; fall back to a listing
+            path = find_normalized(folder, name)
+            st = os.stat(path) if path else None
+        if st is None or st.st_size != size:
+            different.append(name)
+            continue
+        if is_dataless(st):
+            unknown.append(name)
+            continue
+        stats["crc_files"] += 1
+        stats["crc_bytes"] += size
+        if file_crc32(path) != crc:
+            different.append(name)
+    return manifest, different, unknown
+
+
+def find_normalized(folder, name):
+    """Path below folder whose NFC spelling is name, or None"""
+    current = str(folder)
+    for part in name.split("/"):
+        try:
+            match = next((entry for entry in os.listdir(current) if normalize(entry) == part), None)
+        except OSError:
+            return None
+        if match is None:
+            return None
+        current = os.path.join(current, match)
+    return current
+
+
+def find_archive_pairs(roots, recursive=False):
+    """(zip, folder) for every archive with a same-named folder beside it"""
+    stack = [Path(root) for root in roots]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        folders = {normalize(entry.name): Path(entry.path)
+                   for entry in entries if entry.is_dir(follow_symlinks=False)}
+        for entry in entries:
+            if entry.name.lower().endswith(".zip") and entry.is_file(follow_symlinks=False):
+                folder = folders.get(normalize(entry.name[:-len(".zip")]))
+                if folder is not None:
+                    yield Path(entry.path), folder
+        if recursive:
+            stack.extend(folders.values())
+
+
+def find_redundant_archives(roots, recursive=False):
+    """Check every archive/folder pair; returns (results, stats)
+
+    Each result is a dict with the archive, its folder, its entry count,
+    the entries that differ, the entries left unchecked because the folder
+    only holds an evicted iCloud copy, and its size on disk. An archive with
+    no differing and no unchecked entries is redundant: the folder holds
+    everything in it.
+    """
+    stats = {"archives": 0, "crc_files": 0, "crc_bytes": 0, "unreadable": 0}
+    results = []
+    for zip_path, folder in find_archive_pairs(roots, recursive):
+        stats["archives"] += 1
+        try:
+            manifest, different, unknown = compare_archive(zip_path, folder, stats)
+        except (zipfile.BadZipFile, OSError) as e:
+            stats["unreadable"] += 1
+            print(f"   ⚠️  Could not read {zip_path.name}: {e}")
+            continue
+        results.append({"archive": zip_path, "folder": folder, "entries": len(manifest),
+                        "different": different, "unknown": unknown,
+                        "size": zip_path.stat().st_size})
+    return results, stats
+
+
+def report_redundant_archives(roots, recursive=False):
+    """Print which archives duplicate their extracted folder; returns the redundant ones"""
+    results, stats = find_redundant_archives(roots, recursive)
+    redundant = [result for result in results
+                 if result["entries"] and not result["different"] and not result["unknown"]]
+
+    print(f"🗜️  Checked {stats['archives']} archives next to a folder of the same name "
+          f"(CRC32 of {stats['crc_files']} files, {stats['crc_bytes'] / 1e6:,.1f} MB read)")
+    for result in results:
+        name = result["archive"].name
+        if result in redundant:
+            print(f"   ♻️  {name}: all {result['entries']} files are in {result['folder'].name}/ "
+                  f"({result['size'] / 1e6:,.1f} MB)")
+        elif result["different"]:
+            print(f"   ≠  {name}: {len(result['different'])} of {result['entries']} files "
+                  f"missing or different in {result['folder'].name}/")
+        elif result["unknown"]:
+            print(f"   ❔ {name}: {len(result['unknown'])} of {result['entries']} files are evicted "
+                  f"iCloud files in {result['folder'].name}/, download them to check")
+    total = sum(result["size"] for result in redundant)
+    print(f"💾 {len(redundant)} fully redundant archives using {total / 1e6:,.1f} MB")
+    return redundant
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find zips that duplicate their extracted folder")
+    parser.add_argument("folders", nargs="*", type=Path,
+                        default=[Path.home() / "Downloads" / "_ORGANIZED" / "Archived_Projects"],
+                        help="folders holding the zips (default: %(default)s)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="also check archives in subfolders")
+    args = parser.parse_args()
+
+    report_redundant_archives(args.folders, args.recursive)
+    sys.exit(0)